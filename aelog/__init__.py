@@ -8,7 +8,9 @@
 """
 
 from .aelog import *
+from .context import *
 from .log import *
+from .metrics import *
 
 
 __version__ = "1.0.9"
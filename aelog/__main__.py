@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午3:30
+
+aelog命令行工具:
+
+    aelog decode test.log test.log.1.gz --format json
+    aelog query test.log test_error.log --since "2026-10-19 10:00" --until 10m --level WARNING
+"""
+import argparse
+import sys
+from typing import List
+
+from .consts import FORMAT_JSON, FORMAT_TEXT, INDEX_SLACK
+
+__all__ = ("main",)
+
+
+def decode(args: argparse.Namespace):
+    """
+    把二进制格式的日志文件还原为文本或json, 多个文件按参数的顺序输出
+    Args:
+        args: 命令行参数
+    Returns:
+
+    """
+    from .binary import decode_file
+
+    for filename in args.files:
+        for line in decode_file(filename, args.format):
+            args.output.write(f"{line}\n")
+
+
+def query(args: argparse.Namespace):
+    """
+    查询日志文件及其备份文件中时间范围内的日志, 多个日志文件按时间合并输出
+    Args:
+        args: 命令行参数
+    Returns:
+
+    """
+    from .index import query as query_logs
+
+    for text in query_logs(args.files, args.since, args.until, args.level, args.slack):
+        args.output.write(f"{text}\n")
+
+
+def main(argv: List[str] = None):
+    """
+    命令行入口
+    Args:
+        argv: 命令行参数
+    Returns:
+
+    """
+    parser = argparse.ArgumentParser(prog="aelog", description="aelog command line tools")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    decode_parser = subparsers.add_parser("decode", help="render binary log files as text or json lines")
+    decode_parser.add_argument("files", nargs="+", help="binary log files, gzip and zstd backups are supported")
+    decode_parser.add_argument("-f", "--format", choices=(FORMAT_TEXT, FORMAT_JSON), default=FORMAT_TEXT,
+                               help="output format, default text")
+    decode_parser.add_argument("-o", "--output", type=argparse.FileType("w", encoding="utf8"), default=sys.stdout,
+                               help="write to this file instead of stdout")
+    decode_parser.set_defaults(func=decode)
+
+    query_parser = subparsers.add_parser("query", help="print records in a time range across rotated log files")
+    query_parser.add_argument("files", nargs="+", help="current log files, e.g. test.log test_error.log, backups "
+                                                       "and their .idx time indexes are found automatically")
+    query_parser.add_argument("--since", help="start time: timestamp, ISO time or relative like 15m, 2h, 1d")
+    query_parser.add_argument("--until", help="end time, same formats as --since")
+    query_parser.add_argument("--level", default="NOTSET", help="minimum level, e.g. WARNING")
+    query_parser.add_argument("--slack", type=float, default=INDEX_SLACK,
+                              help=f"seconds of out of order timestamps to tolerate, default {INDEX_SLACK:g}")
+    query_parser.add_argument("-o", "--output", type=argparse.FileType("w", encoding="utf8"), default=sys.stdout,
+                              help="write to this file instead of stdout")
+    query_parser.set_defaults(func=query)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"aelog {args.command}: {e}\n")
+    finally:
+        if args.output is not sys.stdout:
+            args.output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,28 +7,60 @@
 @time: 18-3-24 下午10:23
 """
 
-import asyncio
-import inspect
 import logging
 import os
-import traceback
-from concurrent.futures import ThreadPoolExecutor
-from functools import partial
-from logging.config import dictConfig
-from typing import Dict, Tuple
-
-from .consts import BACKUP_COUNT, MAX_BYTES
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from . import metrics
+from .context import _context
+from .consts import (BACKUP_COUNT, DEDUP_WINDOW, FLUSH_INTERVAL, FORMAT_TEXT, LOGGER_CACHE_SIZE, MAX_BYTES,
+                     PROFILE_INTERVAL, QUEUE_POLICY_BLOCK, QUEUE_SIZE, SHIP_FORMAT_NDJSON)
+from .limiter import CallSiteLimiter, Deduplicator
 from .log import aelog_config, aelog_default_config
+from .profiler import CallSiteProfiler
+from .record import AelogRecord
+from .writer import AsyncWriter
 
 __all__ = ("init_app", "debug", "info", "warning", "error", "critical", "exception", "async_debug",
-           "async_info", "async_warning", "async_error", "async_exception", "async_critical")
+           "async_info", "async_warning", "async_error", "async_exception", "async_critical", "flush", "profile_report")
+
+_writer = AsyncWriter()
+
+# 全局级别开关的缓存和root logger的isEnabledFor缓存放在一起, 任何logger的setLevel, logging.disable以及dictConfig
+# 都会通过Manager._clear_cache清空该缓存, 这样级别变化后开关会自动失效重新计算.
+# noinspection PyProtectedMember
+_level_gate: Dict = logging.root._cache
+_GATE_KEY = "aelog_gate"
 
-_pool = ThreadPoolExecutor()
+# (code object, 模块名)到logger的LRU缓存, 有大小限制, 模块reload后旧的code object会被逐渐淘汰
+_logger_cache: OrderedDict = OrderedDict()
+
+# 按调用位置的限流和采样, 没有配置时为None
+_limiter: Optional[CallSiteLimiter] = None
+# 重复日志的合并, 没有配置时为None
+_dedup: Optional[Deduplicator] = None
+# 按调用位置统计日志调用的开销, 没有开启时为None
+_profiler: Optional[CallSiteProfiler] = None
+# 上一次dictConfig的配置和配置后root logger的handler, 配置没有变化时init_app不再重建handler
+_applied_config: Optional[Tuple[Dict, List[logging.Handler]]] = None
 
 
 def init_app(app=None, *, aelog_access_file: str = None, aelog_error_file: str = None,
              aelog_console: bool = True, aelog_level: str = "DEBUG",
-             aelog_max_bytes: int = MAX_BYTES, aelog_backup_count: int = BACKUP_COUNT):
+             aelog_max_bytes: int = MAX_BYTES, aelog_backup_count: int = BACKUP_COUNT, aelog_queue: bool = False,
+             aelog_queue_size: int = QUEUE_SIZE, aelog_queue_policy: str = QUEUE_POLICY_BLOCK,
+             aelog_buffer_bytes: int = 0, aelog_flush_interval: float = FLUSH_INTERVAL,
+             aelog_format: str = FORMAT_TEXT, aelog_multiprocess: bool = False, aelog_rotate_when: str = None,
+             aelog_compress: str = None, aelog_rate_limit: str = None, aelog_sample: Dict = None,
+             aelog_dedup: Union[bool, Iterable] = False, aelog_dedup_window: float = DEDUP_WINDOW,
+             aelog_ring_size: int = 0, aelog_stats: bool = False, aelog_profile: bool = False,
+             aelog_profile_file: str = None, aelog_profile_interval: float = PROFILE_INTERVAL,
+             aelog_mmap: bool = False, aelog_ship_address: str = None,
+             aelog_ship_format: str = SHIP_FORMAT_NDJSON, aelog_ship_spill_file: str = None,
+             aelog_index_bytes: int = 0):
     """
     init global logging
 
@@ -42,9 +74,33 @@ def init_app(app=None, *, aelog_access_file: str = None, aelog_error_file: str =
         aelog_console: terminal output log
         aelog_max_bytes: log file max bytes
         aelog_backup_count: backup count
+        aelog_queue: 日志先放入内存队列, 由后台线程写入console和文件
+        aelog_queue_size: 队列的最大长度
+        aelog_queue_policy: 队列满时的处理策略, block, drop_oldest或drop_newest
+        aelog_buffer_bytes: 日志文件缓冲区大小, 大于0时日志先放入缓冲区再批量写入文件
+        aelog_flush_interval: 缓冲区定时写入的间隔秒数
+        aelog_format: 日志文件的格式, text, json或binary, binary通过aelog decode还原
+        aelog_multiprocess: 多个进程写同一个日志文件, 写入和轮转时使用文件锁
+        aelog_rotate_when: 按时间轮转的周期, hourly, daily或midnight, 为None时按大小轮转
+        aelog_compress: 备份文件在后台线程中的压缩方式, gzip或zstd, 为None时不压缩
+        aelog_rate_limit: 每个调用位置的限流配置, 比如100/s, 被丢弃的数量定期汇总输出
+        aelog_sample: 各级别的采样比例, 比如{"DEBUG": 0.01}
+        aelog_dedup: 合并时间窗口内重复的日志, 为True时合并所有级别, 也可以是级别列表, 比如["ERROR"]
+        aelog_dedup_window: 合并重复日志的时间窗口秒数
+        aelog_ring_size: 大于0时DEBUG和INFO日志只保存在每个线程或task的环形缓冲区中, 出现ERROR时写入错误日志文件
+        aelog_stats: 统计日志管道的数量和耗时, 通过aelog.stats()和aelog.prometheus_text()获取
+        aelog_profile: 按调用位置统计日志调用的开销, 通过aelog.profile_report()获取开销最大的调用位置
+        aelog_profile_file: 定时写入调用位置统计报告的文件
+        aelog_profile_interval: 写入调用位置统计报告的间隔秒数
+        aelog_mmap: 预先分配日志文件并通过mmap写入, 写满aelog_max_bytes时轮转
+        aelog_ship_address: 日志收集端的地址, host:port或者unix:/path/to/socket, 需要配置aelog_access_file
+        aelog_ship_format: 发送到收集端的格式, ndjson或syslog
+        aelog_ship_spill_file: 收集端不可用时保存日志的本地文件, 默认为访问日志文件名加.spill
+        aelog_index_bytes: 大于0时为日志文件维护时间索引, 每写入aelog_index_bytes字节记录一次, 用于aelog query
     Returns:
 
     """
+    global _limiter, _dedup, _profiler, _applied_config
     if app is not None:
         config: Dict = app.config if getattr(app, "config", None) else app.state.config
         aelog_access_file = config.get("AELOG_ACCESS_FILE") or aelog_access_file
@@ -53,20 +109,255 @@ def init_app(app=None, *, aelog_access_file: str = None, aelog_error_file: str =
         aelog_level = config.get("AELOG_LEVEL") or aelog_level
         aelog_max_bytes = config.get("AELOG_MAX_BYTES") or aelog_max_bytes
         aelog_backup_count = config.get("AELOG_BACKUP_COUNT") or aelog_backup_count
+        aelog_queue = config.get("AELOG_QUEUE", aelog_queue)
+        aelog_queue_size = config.get("AELOG_QUEUE_SIZE") or aelog_queue_size
+        aelog_queue_policy = config.get("AELOG_QUEUE_POLICY") or aelog_queue_policy
+        aelog_buffer_bytes = config.get("AELOG_BUFFER_BYTES") or aelog_buffer_bytes
+        aelog_flush_interval = config.get("AELOG_FLUSH_INTERVAL") or aelog_flush_interval
+        aelog_format = config.get("AELOG_FORMAT") or aelog_format
+        aelog_multiprocess = config.get("AELOG_MULTIPROCESS", aelog_multiprocess)
+        aelog_rotate_when = config.get("AELOG_ROTATE_WHEN") or aelog_rotate_when
+        aelog_compress = config.get("AELOG_COMPRESS") or aelog_compress
+        aelog_rate_limit = config.get("AELOG_RATE_LIMIT") or aelog_rate_limit
+        aelog_sample = config.get("AELOG_SAMPLE") or aelog_sample
+        aelog_dedup = config.get("AELOG_DEDUP", aelog_dedup)
+        aelog_dedup_window = config.get("AELOG_DEDUP_WINDOW") or aelog_dedup_window
+        aelog_ring_size = config.get("AELOG_RING_SIZE") or aelog_ring_size
+        aelog_stats = config.get("AELOG_STATS", aelog_stats)
+        aelog_profile = config.get("AELOG_PROFILE", aelog_profile)
+        aelog_profile_file = config.get("AELOG_PROFILE_FILE") or aelog_profile_file
+        aelog_profile_interval = config.get("AELOG_PROFILE_INTERVAL") or aelog_profile_interval
+        aelog_mmap = config.get("AELOG_MMAP", aelog_mmap)
+        aelog_ship_address = config.get("AELOG_SHIP_ADDRESS") or aelog_ship_address
+        aelog_ship_format = config.get("AELOG_SHIP_FORMAT") or aelog_ship_format
+        aelog_ship_spill_file = config.get("AELOG_SHIP_SPILL_FILE") or aelog_ship_spill_file
+        aelog_index_bytes = config.get("AELOG_INDEX_BYTES") or aelog_index_bytes
 
     if aelog_access_file is None:
         aelog_conf = aelog_default_config(loglevel=aelog_level)
     else:
         aelog_conf = aelog_config(aelog_access_file, error_file=aelog_error_file, console=aelog_console,
-                                  loglevel=aelog_level, max_bytes=aelog_max_bytes, backup_count=aelog_backup_count)
-    dictConfig(aelog_conf)
+                                  loglevel=aelog_level, max_bytes=aelog_max_bytes, backup_count=aelog_backup_count,
+                                  queue=aelog_queue, queue_size=aelog_queue_size, queue_policy=aelog_queue_policy,
+                                  buffer_bytes=aelog_buffer_bytes, flush_interval=aelog_flush_interval,
+                                  log_format=aelog_format, multiprocess=aelog_multiprocess,
+                                  rotate_when=aelog_rotate_when, compress=aelog_compress,
+                                  ring_size=aelog_ring_size, mmap=aelog_mmap, ship_address=aelog_ship_address,
+                                  ship_format=aelog_ship_format, ship_spill_file=aelog_ship_spill_file,
+                                  index_bytes=aelog_index_bytes)
+    _limiter = CallSiteLimiter(aelog_rate_limit, aelog_sample) if aelog_rate_limit or aelog_sample else None
+    if _dedup is not None:
+        _dedup.sweep(force=True)
+    _dedup = Deduplicator(aelog_dedup, aelog_dedup_window) if aelog_dedup else None
+    if _profiler is not None:
+        _profiler.close()
+    _profiler = CallSiteProfiler(aelog_profile_file, aelog_profile_interval) if aelog_profile else None
+    if not _config_applied(aelog_conf):
+        # logging.config会导入logging.handlers, socket等模块, 只在需要配置时导入
+        from logging.config import dictConfig
+
+        _applied_config = None
+        dictConfig(aelog_conf)
+        _applied_config = (aelog_conf, logging.root.handlers[:])
+    if aelog_stats:
+        metrics.enable_stats()
+    else:
+        metrics.disable_stats()
+
+
+def _config_applied(aelog_conf: Dict) -> bool:
+    """
+    配置是否和上一次dictConfig的配置相同, 并且配置的handler都还在使用中
+    Args:
+        aelog_conf: dictConfig的配置
+    Returns:
 
+    """
+    if _applied_config is None:
+        return False
+    applied_conf, root_handlers = _applied_config
+    # handler关闭时(比如logging.shutdown)会从logging._handlers中删除, 这时需要重新配置
+    # noinspection PyProtectedMember
+    return (applied_conf == aelog_conf and logging.root.handlers == root_handlers and
+            all(name in logging._handlers for name in aelog_conf["handlers"]))
+
+
+def _level_enabled(level: int) -> bool:
+    """
+    全局级别开关, 只有当所有的logger都不会输出该级别的日志时才返回False.
+
+    结果缓存在root logger的级别缓存中, 关闭级别的日志调用只需要一次字典查找即可返回.
+    Args:
+        level: log level
+    Returns:
+
+    """
+    try:
+        return _level_gate[(_GATE_KEY, level)]
+    except KeyError:
+        manager = logging.root.manager
+        if manager.disable >= level:
+            enabled = False
+        else:
+            levels = [logger.level for logger in list(manager.loggerDict.values())
+                      if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET]
+            enabled = level >= min([logging.root.level, *levels])
+        _level_gate[(_GATE_KEY, level)] = enabled
+        return enabled
+
+
+def _caller_logger(caller_frame) -> logging.Logger:
+    """
+    获取调用方模块对应的logger, 模块名从frame的全局变量__name__中获取, 并按(code object, 模块名)缓存
+    Args:
+        caller_frame: 调用方的frame
+    Returns:
+
+    """
+    name = caller_frame.f_globals.get("__name__") or ""
+    key = (caller_frame.f_code, name)
+    try:
+        logger = _logger_cache[key]
+        _logger_cache.move_to_end(key)
+        return logger
+    except KeyError:
+        logger = logging.getLogger(name)
+        if len(_logger_cache) >= LOGGER_CACHE_SIZE:
+            try:
+                _logger_cache.popitem(last=False)
+            except KeyError:  # pragma: no cover, 其他线程已经淘汰
+                pass
+        _logger_cache[key] = logger
+        return logger
+
+
+def _make_record(level: int, caller_frame, msg, args: Tuple, sep: Optional[str] = " ", *, exc_info=None,
+                 extra: Dict = None, stack_info: bool = False, stacklevel: int = 1
+                 ) -> Optional[Tuple[logging.Logger, logging.LogRecord]]:
+    """
+    直接使用调用方的frame生成日志记录, 不修改共享的logger, 多线程下每条记录都是自己调用方的信息.
+
+    先检查调用方logger的级别, 重复日志的合并和调用位置的限流采样, 多参数的消息延迟到handler格式化时才拼接.
+    Args:
+        level: log level
+        caller_frame: 调用方的frame
+        msg: 要打印消息内容
+        args: 要打印的其他消息内容
+        sep: 多个消息的分隔符, 为None时args作为标准库的格式化参数
+        exc_info: 异常信息
+        extra: 额外的记录属性
+        stack_info: 是否输出调用栈
+        stacklevel: 调用栈的层级, 大于1时向上查找调用方
+    Returns:
+        (logger, record), 级别关闭或者被合并, 限流, 采样丢弃时返回None
+    """
+    logger = _caller_logger(caller_frame)
+    if not logger.isEnabledFor(level):
+        return None
+    if _dedup is not None and not _dedup.allow(logger, level, caller_frame, msg):
+        return None
+    if _limiter is not None and not _limiter.allow(level, caller_frame):
+        return None
+    fn, lno, func, sinfo = find_caller(caller_frame, stack_info, stacklevel)
+    if exc_info:
+        if isinstance(exc_info, BaseException):
+            exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+        elif not isinstance(exc_info, tuple):
+            exc_info = sys.exc_info()
+    if sep is None:
+        record = logger.makeRecord(logger.name, level, fn, lno, msg, args, exc_info, func, extra, sinfo)
+    else:
+        # 多参数的消息在handler格式化时才拼接
+        record = AelogRecord(logger.name, level, fn, lno, msg, args, exc_info, func, sinfo, sep)
+    # 生成记录时保存调用方绑定的上下文, async_*的日志在后台线程输出时也不会丢失
+    record.context = _context.get()
+    if metrics.enabled:
+        metrics.incr(("records", level, logger.name))
+    return logger, record
+
+
+def _log(level: int, caller_frame, msg, args: Tuple, sep: Optional[str] = " ", **kwargs):
+    """
+    输出日志
+    Args:
+        level: log level
+        caller_frame: 调用方的frame
+        msg: 要打印消息内容
+        args: 要打印的其他消息内容
+        sep: 多个消息的分隔符
+        kwargs: exc_info, extra, stack_info等参数
+    Returns:
 
-def find_caller(caller_frame, stack_info=False) -> Tuple:
+    """
+    if _profiler is not None:
+        _profile_log(_profiler, level, caller_frame, msg, args, sep, kwargs)
+        return
+    logger_record = _make_record(level, caller_frame, msg, args, sep, **kwargs)
+    if logger_record is not None:
+        logger, record = logger_record
+        logger.handle(record)
+
+
+def _profile_log(profiler: CallSiteProfiler, level: int, caller_frame, msg, args: Tuple, sep: Optional[str],
+                 kwargs: Dict, handle=None):
+    """
+    输出日志并统计调用位置的开销
+    Args:
+        profiler: 调用位置统计
+        level: log level
+        caller_frame: 调用方的frame
+        msg: 要打印消息内容
+        args: 要打印的其他消息内容
+        sep: 多个消息的分隔符
+        kwargs: exc_info, extra, stack_info等参数
+        handle: 输出日志记录的函数, 为None时使用logger.handle
+    Returns:
+
+    """
+    start = time.perf_counter()
+    logger_record = _make_record(level, caller_frame, msg, args, sep, **kwargs)
+    if logger_record is None:
+        return
+    logger, record = logger_record
+    size = len(record.getMessage())
+    built = time.perf_counter()
+    if handle is None:
+        logger.handle(record)
+    else:
+        handle(logger, record)
+    profiler.add(caller_frame, built - start, size, time.perf_counter() - built)
+
+
+async def _async_log(level: int, caller_frame, msg, args: Tuple, sep: Optional[str] = " ", **kwargs):
+    """
+    在调用方生成日志记录, 放入后台线程的队列后立即返回
+    Args:
+        level: log level
+        caller_frame: 调用方的frame
+        msg: 要打印消息内容
+        args: 要打印的其他消息内容
+        sep: 多个消息的分隔符
+        kwargs: exc_info, extra, stack_info等参数
+    Returns:
+
+    """
+    if _profiler is not None:
+        # handler在后台线程中输出, 只统计生成记录和放入队列的开销
+        _profile_log(_profiler, level, caller_frame, msg, args, sep, kwargs, _writer.put)
+        return
+    logger_record = _make_record(level, caller_frame, msg, args, sep, **kwargs)
+    if logger_record is not None:
+        logger, record = logger_record
+        _writer.put(logger, record)
+
+
+def find_caller(caller_frame, stack_info=False, stacklevel=1) -> Tuple:
     """
     Find the stack frame of the caller so that we can note the source
     file name, line number and function name.
     """
+    while stacklevel > 1 and getattr(caller_frame, "f_back", None) is not None:
+        caller_frame, stacklevel = caller_frame.f_back, stacklevel - 1
     if hasattr(caller_frame, "f_code"):
         co = caller_frame.f_code
     else:
@@ -74,6 +365,8 @@ def find_caller(caller_frame, stack_info=False) -> Tuple:
 
     sinfo = None
     if stack_info:
+        import traceback
+
         sio = os.io.StringIO()  # type: ignore
         sio.write('Stack (most recent call last):\n')
         traceback.print_stack(caller_frame, file=sio)
@@ -95,11 +388,9 @@ def debug(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.debug(f"{sep}".join(str(val) for val in (msg, *args)))
+    if not _level_enabled(logging.DEBUG):
+        return
+    _log(logging.DEBUG, sys._getframe(1), msg, args, sep)
 
 
 def info(msg, *args, sep=' '):
@@ -113,11 +404,9 @@ def info(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.info(f"{sep}".join(str(val) for val in (msg, *args)))
+    if not _level_enabled(logging.INFO):
+        return
+    _log(logging.INFO, sys._getframe(1), msg, args, sep)
 
 
 def warning(msg, *args, sep=' '):
@@ -131,11 +420,9 @@ def warning(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.warning(f"{sep}".join(str(val) for val in (msg, *args)))
+    if not _level_enabled(logging.WARNING):
+        return
+    _log(logging.WARNING, sys._getframe(1), msg, args, sep)
 
 
 def error(msg, *args, sep=' '):
@@ -149,11 +436,9 @@ def error(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.error(f"{sep}".join(str(val) for val in (msg, *args)))
+    if not _level_enabled(logging.ERROR):
+        return
+    _log(logging.ERROR, sys._getframe(1), msg, args, sep)
 
 
 def critical(msg, *args, sep=' '):
@@ -167,11 +452,9 @@ def critical(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.critical(f"{sep}".join(str(val) for val in (msg, *args)))
+    if not _level_enabled(logging.CRITICAL):
+        return
+    _log(logging.CRITICAL, sys._getframe(1), msg, args, sep)
 
 
 def exception(msg, *args, **kwargs):
@@ -185,11 +468,9 @@ def exception(msg, *args, **kwargs):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    logger.exception(msg, *args, exc_info=msg, **kwargs)
+    if not _level_enabled(logging.ERROR):
+        return
+    _log(logging.ERROR, sys._getframe(1), msg, args, None, exc_info=msg, **kwargs)
 
 
 async def async_debug(msg, *args, sep=' '):
@@ -203,11 +484,9 @@ async def async_debug(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.debug, f"{sep}".join(str(val) for val in (msg, *args))))
+    if not _level_enabled(logging.DEBUG):
+        return
+    await _async_log(logging.DEBUG, sys._getframe(1), msg, args, sep)
 
 
 async def async_info(msg, *args, sep=' '):
@@ -221,11 +500,9 @@ async def async_info(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.info, f"{sep}".join(str(val) for val in (msg, *args))))
+    if not _level_enabled(logging.INFO):
+        return
+    await _async_log(logging.INFO, sys._getframe(1), msg, args, sep)
 
 
 async def async_warning(msg, *args, sep=' '):
@@ -239,11 +516,9 @@ async def async_warning(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.warning, f"{sep}".join(str(val) for val in (msg, *args))))
+    if not _level_enabled(logging.WARNING):
+        return
+    await _async_log(logging.WARNING, sys._getframe(1), msg, args, sep)
 
 
 async def async_error(msg, *args, sep=' '):
@@ -257,11 +532,9 @@ async def async_error(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.error, f"{sep}".join(str(val) for val in (msg, *args))))
+    if not _level_enabled(logging.ERROR):
+        return
+    await _async_log(logging.ERROR, sys._getframe(1), msg, args, sep)
 
 
 async def async_critical(msg, *args, sep=' '):
@@ -275,11 +548,9 @@ async def async_critical(msg, *args, sep=' '):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.critical, f"{sep}".join(str(val) for val in (msg, *args))))
+    if not _level_enabled(logging.CRITICAL):
+        return
+    await _async_log(logging.CRITICAL, sys._getframe(1), msg, args, sep)
 
 
 async def async_exception(msg, *args, **kwargs):
@@ -293,8 +564,30 @@ async def async_exception(msg, *args, **kwargs):
     Returns:
 
     """
-    caller_frame = inspect.currentframe().f_back
-    caller_module = inspect.getmodule(caller_frame)
-    logger = logging.getLogger(caller_module.__name__ if caller_module else "")
-    logger.findCaller = partial(find_caller, caller_frame)
-    await asyncio.wrap_future(_pool.submit(logger.exception, msg, *args, exc_info=msg, **kwargs))
+    if not _level_enabled(logging.ERROR):
+        return
+    await _async_log(logging.ERROR, sys._getframe(1), msg, args, None, exc_info=msg, **kwargs)
+
+
+def profile_report(top: int = None) -> List[Dict]:
+    """
+    按总耗时从大到小返回开销最大的日志调用位置, 需要init_app(aelog_profile=True)
+    Args:
+        top: 调用位置数量, 默认20
+    Returns:
+        每个调用位置的文件, 行号, 函数, 调用次数, 生成记录和消息的秒数, 消息字符数, handler秒数和总秒数
+    """
+    return [] if _profiler is None else _profiler.report(top)
+
+
+async def flush():
+    """
+    等待async_*输出的日志全部写入handler, 比如在服务关闭前调用. 进程退出时也会自动输出剩余的日志.
+    Args:
+
+    Returns:
+
+    """
+    import asyncio
+
+    await asyncio.wrap_future(_writer.flush())
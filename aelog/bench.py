@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午8:20
+
+aelog各输出路径的基准测试, 结果输出为json, 用于对比不同版本的性能:
+
+    python -m aelog.bench --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+import aelog
+
+__all__ = ("run", "main")
+
+# 每次计时连续调用的次数, 单次调用的耗时为该批次的平均值, 避免计时本身的开销影响很快的调用
+BATCH = 100
+
+
+def _summary(batches: List[int], calls: int, elapsed: float) -> Dict:
+    """
+    汇总每秒调用次数和单次调用耗时的分位数
+    Args:
+        batches: 每个批次的耗时纳秒数
+        calls: 总调用次数
+        elapsed: 总耗时秒数
+    Returns:
+
+    """
+    latencies = sorted(cost / BATCH for cost in batches)
+
+    def percentile(ratio: float) -> float:
+        return round(latencies[min(int(len(latencies) * ratio), len(latencies) - 1)], 1)
+
+    return {
+        "calls": calls,
+        "calls_per_sec": round(calls / elapsed),
+        "latency_ns": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+                       "max": round(latencies[-1], 1)},
+    }
+
+
+def _timed_batches(func: Callable, number: int) -> List[int]:
+    """
+    分批调用并记录每个批次的耗时
+    Args:
+        func: 要测试的函数
+        number: 调用次数
+    Returns:
+
+    """
+    batches = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(max(number // BATCH, 1)):
+        start = perf_counter_ns()
+        for _ in range(BATCH):
+            func()
+        batches.append(perf_counter_ns() - start)
+    return batches
+
+
+def measure(func: Callable, number: int) -> Dict:
+    """
+    在当前线程中测试函数的调用性能
+    Args:
+        func: 要测试的函数
+        number: 调用次数
+    Returns:
+
+    """
+    start = time.perf_counter()
+    batches = _timed_batches(func, number)
+    return _summary(batches, len(batches) * BATCH, time.perf_counter() - start)
+
+
+def bench_disabled(number: int, tmp_dir: str) -> Dict:
+    """
+    级别关闭时的调用
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "disabled.log"), aelog_console=False,
+                   aelog_level="INFO")
+    payload = {"key": list(range(100))}
+    return measure(lambda: aelog.debug("disabled message", payload), number)
+
+
+def bench_console(number: int, tmp_dir: str) -> Dict:
+    """
+    输出到终端, 终端输出重定向到/dev/null
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            aelog.init_app()
+            return measure(lambda: aelog.info("console message", 1, [1, 2, 3]), number)
+        finally:
+            sys.stdout = stdout
+
+
+def bench_file(number: int, tmp_dir: str) -> Dict:
+    """
+    aelog_config的文件输出, INFO日志只写入访问日志文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "file.log"), aelog_console=False)
+    return measure(lambda: aelog.info("file message", 1, [1, 2, 3]), number)
+
+
+def bench_file_error(number: int, tmp_dir: str) -> Dict:
+    """
+    aelog_config的文件输出, ERROR日志同时写入访问日志文件和错误日志文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "file_error.log"), aelog_console=False)
+    return measure(lambda: aelog.error("file error message", 1, [1, 2, 3]), number)
+
+
+def bench_file_mmap(number: int, tmp_dir: str) -> Dict:
+    """
+    aelog_config的mmap文件输出, INFO日志只写入访问日志文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "file_mmap.log"), aelog_console=False, aelog_mmap=True)
+    return measure(lambda: aelog.info("file message", 1, [1, 2, 3]), number)
+
+
+def bench_file_binary(number: int, tmp_dir: str) -> Dict:
+    """
+    aelog_config的二进制格式文件输出, INFO日志只写入访问日志文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "file_binary.log"), aelog_console=False,
+                   aelog_format="binary")
+    return measure(lambda: aelog.info("file message", 1, [1, 2, 3]), number)
+
+
+def bench_async(number: int, tmp_dir: str, tasks: int = 8) -> Dict:
+    """
+    事件循环中多个task并发调用async_*输出到文件, 总耗时包含等待后台线程写完
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+        tasks: 并发的task数量
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "async.log"), aelog_console=False)
+    batches: List[int] = []
+    perf_counter_ns = time.perf_counter_ns
+
+    async def worker():
+        for _ in range(max(number // tasks // BATCH, 1)):
+            start = perf_counter_ns()
+            for _ in range(BATCH):
+                await aelog.async_info("async message", 1, [1, 2, 3])
+            batches.append(perf_counter_ns() - start)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(tasks)))
+        await aelog.flush()
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return _summary(batches, len(batches) * BATCH, time.perf_counter() - start)
+
+
+def bench_exception(number: int, tmp_dir: str, depth: int = 30) -> Dict:
+    """
+    aelog.exception输出调用栈很深的异常到文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+        depth: 调用栈的深度
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "exception.log"), aelog_console=False)
+
+    def nested(level):
+        return 1 / 0 if level == 0 else nested(level - 1)
+
+    def log_exception():
+        try:
+            nested(depth)
+        except ZeroDivisionError as e:
+            aelog.exception(e)
+
+    return measure(log_exception, number)
+
+
+def bench_threads(number: int, tmp_dir: str, threads: int = 8) -> Dict:
+    """
+    多个线程同时输出到文件
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+        threads: 线程数量
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=os.path.join(tmp_dir, "threads.log"), aelog_console=False)
+    results: List[List[int]] = []
+
+    def worker():
+        results.append(_timed_batches(lambda: aelog.info("thread message", 1, [1, 2, 3]), number // threads))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    batches = [cost for result in results for cost in result]
+    return _summary(batches, len(batches) * BATCH, time.perf_counter() - start)
+
+
+# 导入aelog时不应该导入的模块, 在第一次使用时才导入
+LAZY_MODULES = ("asyncio", "colorlog", "concurrent.futures", "logging.config")
+
+_COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter_ns()
+import aelog
+imported = time.perf_counter_ns()
+aelog.init_app(aelog_access_file=sys.argv[1], aelog_console=False)
+aelog.info("cold start message")
+logged = time.perf_counter_ns()
+print(json.dumps({"import_ns": imported - start, "first_log_ns": logged - imported,
+                  "loaded": [name for name in sys.argv[2:] if name in sys.modules]}))
+"""
+
+
+def bench_cold_start(number: int, tmp_dir: str) -> Dict:
+    """
+    新进程中导入aelog和第一次输出日志到文件的耗时, 每BATCH次调用启动一个进程, 用于短时运行的任务
+    Args:
+        number: 调用次数
+        tmp_dir: 日志文件目录
+    Returns:
+
+    """
+    import_ms, first_log_ms, loaded = [], [], set()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (
+        os.path.dirname(os.path.dirname(os.path.abspath(aelog.__file__))), os.environ.get("PYTHONPATH")))))
+    for _ in range(max(number // BATCH, 1)):
+        output = subprocess.run([sys.executable, "-c", _COLD_START_SCRIPT, os.path.join(tmp_dir, "cold_start.log"),
+                                 *LAZY_MODULES], env=env, check=True, stdout=subprocess.PIPE).stdout
+        result = json.loads(output)
+        import_ms.append(result["import_ns"] / 1e6)
+        first_log_ms.append(result["first_log_ns"] / 1e6)
+        loaded.update(result["loaded"])
+    import_ms.sort()
+    first_log_ms.sort()
+    return {
+        "runs": len(import_ms),
+        "import_ms": {"p50": round(import_ms[len(import_ms) // 2], 2), "max": round(import_ms[-1], 2)},
+        "first_log_ms": {"p50": round(first_log_ms[len(first_log_ms) // 2], 2), "max": round(first_log_ms[-1], 2)},
+        "lazy_modules_loaded": sorted(loaded),
+    }
+
+
+# 基准测试名称, 测试函数和调用次数相对于--number的比例
+BENCHMARKS = (
+    ("disabled", bench_disabled, 10),
+    ("console", bench_console, 1),
+    ("file", bench_file, 1),
+    ("file_error", bench_file_error, 1),
+    ("file_mmap", bench_file_mmap, 1),
+    ("file_binary", bench_file_binary, 1),
+    ("async", bench_async, 1),
+    ("exception", bench_exception, 0.1),
+    ("threads", bench_threads, 1),
+    ("cold_start", bench_cold_start, 0.05),
+)
+
+
+def run(number: int = 20000, names: List[str] = None) -> Dict:
+    """
+    运行基准测试
+    Args:
+        number: 基础调用次数, 各测试按比例调整
+        names: 要运行的测试名称, 为None时运行全部
+    Returns:
+        json报告
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            for name, func, scale in BENCHMARKS:
+                if names is None or name in names:
+                    results[name] = func(max(int(number * scale), BATCH), tmp_dir)
+        finally:
+            # 删除临时目录之前关闭日志文件, 测试结束后恢复为默认的终端输出
+            aelog.init_app()
+    return {
+        "aelog": aelog.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "number": number,
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None):
+    """
+    命令行入口
+    Args:
+        argv: 命令行参数
+    Returns:
+
+    """
+    parser = argparse.ArgumentParser(prog="python -m aelog.bench", description="aelog benchmark, output json report")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="base number of calls per benchmark")
+    parser.add_argument("-o", "--output", help="write the json report to this file instead of stdout")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, default all: "
+                                                  f"{', '.join(name for name, _, _ in BENCHMARKS)}")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - {name for name, _, _ in BENCHMARKS}
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    report = json.dumps(run(args.number, args.names or None), indent=2)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午2:10
+"""
+import logging
+import os
+import struct
+from logging.handlers import RotatingFileHandler
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from .consts import FILE_DATE_FORMAT, FILE_LOG_FORMAT, FORMAT_JSON, FORMAT_TEXT
+# noinspection PyProtectedMember
+from .formatters import _RECORD_ATTRS, JsonFormatter, PlainFormatter, format_exception
+from .handlers import CompressRotatorMixin, open_log_file
+from .index import TimeIndexMixin
+
+__all__ = ("BinaryRotatingFileHandler", "decode_records", "decode_file")
+
+# 文件头, 每个日志文件(包括轮转后的备份)都可以单独解码
+MAGIC = b"AELOGB\x01\n"
+
+# 条目类型, 每个条目为类型, 长度和内容
+_SESSION = 0  # handler重新打开文件, 解码时清空模板和时间
+_TEMPLATE = 1  # 调用位置的模板
+_RECORD = 2  # 日志记录
+
+# 消息的生成方式
+_MODE_MESSAGE = 0  # 已经生成的消息
+_MODE_JOIN = 1  # aelog的多参数消息, 用分隔符拼接
+_MODE_PERCENT = 2  # 标准库的%格式化, 格式字符串保存在模板中
+
+# 值的类型
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR = range(6)
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+# 记录的可选部分
+_FLAG_EXC_TEXT, _FLAG_STACK_INFO, _FLAG_EXTRA = 1, 2, 4
+
+_pack_double = struct.Struct("<d").pack
+_unpack_double = struct.Struct("<d").unpack_from
+
+def _pack_uint(buf: bytearray, value: int):
+    """
+    写入无符号varint
+    Args:
+        buf: 缓冲区
+        value: 非负整数
+    Returns:
+
+    """
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _pack_str(buf: bytearray, value: str):
+    """
+    写入长度和utf8编码的字符串
+    Args:
+        buf: 缓冲区
+        value: 字符串
+    Returns:
+
+    """
+    data = value.encode("utf-8", "backslashreplace")
+    _pack_uint(buf, len(data))
+    buf += data
+
+
+def _pack_value(buf: bytearray, value):
+    """
+    写入带类型的值, 其他类型的值写入str的结果
+    Args:
+        buf: 缓冲区
+        value: 值
+    Returns:
+
+    """
+    value_type = type(value)
+    if value_type is str:
+        buf.append(_STR)
+        _pack_str(buf, value)
+    elif value_type is int:
+        buf.append(_INT)
+        _pack_uint(buf, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif value_type is float:
+        buf.append(_FLOAT)
+        buf += _pack_double(value)
+    elif value is None:
+        buf.append(_NONE)
+    elif value is True:
+        buf.append(_TRUE)
+    elif value is False:
+        buf.append(_FALSE)
+    else:
+        buf.append(_STR)
+        _pack_str(buf, str(value))
+
+
+def _pack_entry(buf: bytearray, kind: int, payload: bytearray):
+    """
+    写入一个条目, 截断的条目在解码时可以识别
+    Args:
+        buf: 缓冲区
+        kind: 条目类型
+        payload: 条目内容
+    Returns:
+
+    """
+    buf.append(kind)
+    _pack_uint(buf, len(payload))
+    buf += payload
+
+
+class BinaryRotatingFileHandler(TimeIndexMixin, CompressRotatorMixin, RotatingFileHandler):
+    """
+    二进制格式的日志文件handler, 写入时不格式化消息和时间.
+
+    每个调用位置的logger, 文件, 行号, 函数, 级别和格式字符串作为模板只在每个文件中写入一次, 之后每条日志只写入模板编号,
+    时间差和varint编码的参数. 通过aelog decode命令还原为文本或者json.
+
+    维护时间索引时, 每个索引位置重新开始一个会话, 从索引位置开始可以单独解码.
+    """
+
+    def __init__(self, filename: str, mode: str = "ab", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, compress: str = None, index_bytes: int = 0):
+        """
+        二进制格式的日志文件handler
+        Args:
+            filename: log file
+            mode: 只支持追加写入, 兼容dictConfig的参数
+            maxBytes: log file max bytes
+            backupCount: backup count
+            encoding: 不使用, 兼容dictConfig的参数
+            delay: 第一次输出日志时才打开文件
+            compress: 备份文件的压缩方式, gzip或zstd, 为None时不压缩
+            index_bytes: 时间索引的间隔字节数, 为0时不维护索引
+        Returns:
+
+        """
+        self._templates: Dict[Tuple, int] = {}
+        self._last_us = 0
+        super().__init__(filename, "ab", maxBytes, backupCount, None, delay)
+        self.setup_compress(compress)
+        self.setup_index(index_bytes)
+
+    def _open(self) -> BinaryIO:
+        """
+        打开文件, 新文件写入文件头, 已有的文件写入新的会话, 模板重新编号
+        Args:
+
+        Returns:
+
+        """
+        stream = open(self.baseFilename, "ab")
+        self._templates.clear()
+        self._last_us = 0
+        if stream.tell() == 0:
+            stream.write(MAGIC)
+        else:
+            stream.write(bytes((_SESSION, 0)))
+        stream.flush()
+        return stream
+
+    def encode(self, record: logging.LogRecord) -> bytearray:
+        """
+        编码日志记录, 调用位置第一次出现时先写入模板
+        Args:
+            record: log record
+        Returns:
+
+        """
+        args = record.args
+        if getattr(record, "sep", None) is not None:
+            mode, text, values = _MODE_JOIN, record.sep, (record.msg, *args)
+        elif not args:
+            mode, text, values = _MODE_MESSAGE, "", (record.msg if type(record.msg) is str else record.getMessage(),)
+        elif isinstance(args, tuple) and type(record.msg) is str and all(
+                isinstance(value, _PRIMITIVES) for value in args):
+            mode, text, values = _MODE_PERCENT, record.msg, args
+        else:
+            mode, text, values = _MODE_MESSAGE, "", (record.getMessage(),)
+
+        buf = bytearray()
+        key = (record.name, record.pathname, record.lineno, record.funcName, record.levelno, mode, text)
+        template_id = self._templates.get(key)
+        if template_id is None:
+            template_id = self._templates[key] = len(self._templates)
+            payload = bytearray()
+            _pack_uint(payload, template_id)
+            for value in (record.name, record.pathname):
+                _pack_str(payload, value)
+            _pack_uint(payload, record.lineno)
+            _pack_str(payload, record.funcName or "")
+            _pack_uint(payload, record.levelno)
+            _pack_uint(payload, mode)
+            _pack_str(payload, text)
+            _pack_entry(buf, _TEMPLATE, payload)
+
+        payload = bytearray()
+        _pack_uint(payload, template_id)
+        created_us = int(record.created * 1000000)
+        delta = created_us - self._last_us
+        self._last_us = created_us
+        _pack_uint(payload, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        _pack_uint(payload, len(values))
+        for value in values:
+            _pack_value(payload, value)
+        context = getattr(record, "context", None) or {}
+        _pack_uint(payload, len(context))
+        for key, value in context.items():
+            _pack_str(payload, str(key))
+            _pack_value(payload, value)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = format_exception(record.exc_info)
+        extra_keys = record.__dict__.keys() - _RECORD_ATTRS
+        flags = ((_FLAG_EXC_TEXT if record.exc_text else 0) | (_FLAG_STACK_INFO if record.stack_info else 0) |
+                 (_FLAG_EXTRA if extra_keys else 0))
+        _pack_uint(payload, flags)
+        if record.exc_text:
+            _pack_str(payload, record.exc_text)
+        if record.stack_info:
+            _pack_str(payload, record.stack_info)
+        if extra_keys:
+            _pack_uint(payload, len(extra_keys))
+            for key in sorted(extra_keys):
+                _pack_str(payload, key)
+                _pack_value(payload, record.__dict__[key])
+        _pack_entry(buf, _RECORD, payload)
+        return buf
+
+    def _index_point(self, record: logging.LogRecord):
+        """
+        需要写入索引时先开始新的会话, 再记录会话开始的偏移量
+        Args:
+            record: log record
+        Returns:
+
+        """
+        if self.index_bytes <= 0 or not self.index_due(self.stream.tell()):
+            return
+        if self._templates or self._last_us:
+            self.stream.write(bytes((_SESSION, 0)))
+            self._templates.clear()
+            self._last_us = 0
+        self.index_record(record.created, self.stream.tell())
+
+    def emit(self, record: logging.LogRecord):
+        """
+        编码后写入文件, 超过文件大小时轮转, 轮转后模板重新写入新文件
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self._index_point(record)
+            data = self.encode(record)
+            if 0 < self.maxBytes < self.stream.tell() + len(data) and self.stream.tell() > len(MAGIC):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                self._index_point(record)
+                data = self.encode(record)
+            self.stream.write(data)
+            self.stream.flush()
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        """
+        等待上一次的压缩完成后轮转
+        Args:
+
+        Returns:
+
+        """
+        self.wait_compress()
+        super().doRollover()
+
+
+class _Reader(object):
+    """
+    按偏移量读取缓冲区中的varint, 字符串和值
+    """
+
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def uint(self) -> int:
+        data, pos = self.data, self.pos
+        result = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def sint(self) -> int:
+        value = self.uint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def str(self) -> str:
+        size = self.uint()
+        start = self.pos
+        self.pos += size
+        return self.data[start:self.pos].decode("utf-8")
+
+    def value(self):
+        kind = self.data[self.pos]
+        self.pos += 1
+        if kind == _STR:
+            return self.str()
+        if kind == _INT:
+            return self.sint()
+        if kind == _FLOAT:
+            value = _unpack_double(self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        return {_NONE: None, _TRUE: True, _FALSE: False}[kind]
+
+
+def _read_uint(fp: BinaryIO) -> int:
+    """
+    从文件中读取条目长度的varint
+    Args:
+        fp: 文件对象
+    Returns:
+        长度, 文件结束时为-1
+    """
+    result = shift = 0
+    while True:
+        byte = fp.read(1)
+        if not byte:
+            return -1
+        result |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return result
+        shift += 7
+
+
+class _Decoder(object):
+    """
+    还原二进制日志的条目, 保存文件中已经出现的模板和上一条日志的时间
+    """
+
+    __slots__ = ("templates", "last_us")
+
+    def __init__(self):
+        self.templates: Dict[int, Tuple] = {}
+        self.last_us = 0
+
+    def entry(self, kind: int, payload: bytes) -> Optional[logging.LogRecord]:
+        """
+        还原一个条目
+        Args:
+            kind: 条目类型
+            payload: 条目内容
+        Returns:
+            日志记录, 模板等其他条目返回None
+        """
+        reader = _Reader(payload)
+        if kind == _SESSION:
+            self.templates.clear()
+            self.last_us = 0
+        elif kind == _TEMPLATE:
+            template_id = reader.uint()
+            self.templates[template_id] = (reader.str(), reader.str(), reader.uint(), reader.str(), reader.uint(),
+                                           reader.uint(), reader.str())
+        elif kind == _RECORD:
+            name, pathname, lineno, func, levelno, mode, text = self.templates[reader.uint()]
+            self.last_us += reader.sint()
+            last_us = self.last_us
+            values = [reader.value() for _ in range(reader.uint())]
+            context = {reader.str(): reader.value() for _ in range(reader.uint())}
+            flags = reader.uint()
+            if mode == _MODE_JOIN:
+                message = text.join(str(value) for value in values)
+            elif mode == _MODE_PERCENT:
+                message = text % tuple(values)
+            else:
+                message = values[0]
+            attrs = {
+                "name": name, "msg": message, "args": (), "levelno": levelno,
+                "levelname": logging.getLevelName(levelno), "pathname": pathname,
+                "filename": os.path.basename(pathname), "module": os.path.splitext(os.path.basename(pathname))[0],
+                "lineno": lineno, "funcName": func, "created": last_us / 1000000, "msecs": last_us % 1000000 / 1000,
+                "context": context, "context_text": "".join(f"{key}={value} " for key, value in context.items()),
+                "exc_text": reader.str() if flags & _FLAG_EXC_TEXT else None,
+                "stack_info": reader.str() if flags & _FLAG_STACK_INFO else None,
+            }
+            if flags & _FLAG_EXTRA:
+                attrs.update((reader.str(), reader.value()) for _ in range(reader.uint()))
+            return logging.makeLogRecord(attrs)
+        return None
+
+
+def decode_records(fp: BinaryIO, offset: int = 0) -> Iterator[logging.LogRecord]:
+    """
+    从二进制格式的日志文件中还原日志记录, 文件末尾不完整的条目被忽略
+    Args:
+        fp: 二进制只读的文件对象
+        offset: 开始解码的偏移量, 必须是文件头之后或者时间索引中的偏移量
+    Returns:
+
+    """
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise ValueError("不是aelog二进制格式的日志文件")
+    if offset > len(MAGIC):
+        fp.seek(offset)
+    decoder = _Decoder()
+    while True:
+        kind = fp.read(1)
+        size = _read_uint(fp) if kind else -1
+        payload = fp.read(size) if size > 0 else b""
+        if size < 0 or len(payload) < size:
+            return
+        record = decoder.entry(kind[0], payload)
+        if record is not None:
+            yield record
+
+
+def decode_file(filename: str, log_format: str = FORMAT_TEXT) -> Iterator[str]:
+    """
+    把二进制格式的日志文件还原为和文本或json日志文件相同的行, 支持压缩的备份文件
+    Args:
+        filename: 日志文件
+        log_format: 输出的格式, text或json
+    Returns:
+
+    """
+    formatter = JsonFormatter() if log_format == FORMAT_JSON else PlainFormatter(FILE_LOG_FORMAT, FILE_DATE_FORMAT)
+    with open_log_file(filename) as fp:
+        for record in decode_records(fp):
+            yield formatter.format(record)
+
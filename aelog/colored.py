@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午11:40
+"""
+import colorlog
+
+from .formatters import format_exception
+
+__all__ = ("ColoredFormatter",)
+
+
+class ColoredFormatter(colorlog.ColoredFormatter):
+    """
+    终端输出使用的彩色formatter, 异常信息不带颜色, 格式化结果保存在record.exc_text中供日志文件的formatter共用.
+    """
+
+    def formatException(self, ei) -> str:
+        """
+        格式化异常信息, 调用栈按代码位置缓存
+        Args:
+            ei: exc_info
+        Returns:
+
+        """
+        return format_exception(ei)
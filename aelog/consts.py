@@ -6,7 +6,71 @@
 @software: PyCharm
 @time: 2020/9/27 下午5:33
 """
-__all__ = ("MAX_BYTES", "BACKUP_COUNT")
+__all__ = ("MAX_BYTES", "BACKUP_COUNT", "LOGGER_CACHE_SIZE", "QUEUE_SIZE", "QUEUE_POLICY_BLOCK",
+           "QUEUE_POLICY_DROP_OLDEST", "QUEUE_POLICY_DROP_NEWEST", "QUEUE_POLICIES",
+           "WRITER_BATCH_SIZE", "BUFFER_BYTES", "FLUSH_INTERVAL",
+           "FORMAT_TEXT", "FORMAT_JSON", "FORMAT_BINARY", "FORMATS", "FILE_LOG_FORMAT", "FILE_DATE_FORMAT",
+           "ROTATE_WHENS", "COMPRESS_GZIP", "COMPRESS_ZSTD",
+           "COMPRESS_SUFFIXES", "RATE_UNITS", "SUPPRESS_SUMMARY_INTERVAL", "LIMITER_SITES",
+           "DEDUP_WINDOW", "DEDUP_SIZE", "TRACEBACK_CACHE_SIZE", "RING_SIZE",
+           "RING_BUFFERS", "DURATION_BUCKETS",
+           "PROFILE_INTERVAL", "PROFILE_TOP", "MMAP_SEGMENT_BYTES", "SHIP_FORMAT_NDJSON", "SHIP_FORMAT_SYSLOG",
+           "SHIP_FORMATS", "SHIP_BATCH_SIZE", "SHIP_BATCH_BYTES", "SHIP_BACKOFF_MAX", "SHIP_TIMEOUT",
+           "SHIP_SPILL_BYTES", "INDEX_SUFFIX", "INDEX_BYTES", "INDEX_SLACK",
+           "READER_CHUNK_BYTES", "READER_INTERVAL")
 
 MAX_BYTES = 100 * 1024 * 1024  # 默认100M
 BACKUP_COUNT = 5  # 默认5个文件
+LOGGER_CACHE_SIZE = 1024  # 调用方logger的缓存数量
+TRACEBACK_CACHE_SIZE = 256  # 异常调用栈格式化结果的缓存数量
+
+QUEUE_SIZE = 10000  # 后台写日志队列的默认长度
+QUEUE_POLICY_BLOCK = "block"  # 队列满时阻塞等待
+QUEUE_POLICY_DROP_OLDEST = "drop_oldest"  # 队列满时丢弃最早的日志
+QUEUE_POLICY_DROP_NEWEST = "drop_newest"  # 队列满时丢弃当前的日志
+QUEUE_POLICIES = (QUEUE_POLICY_BLOCK, QUEUE_POLICY_DROP_OLDEST, QUEUE_POLICY_DROP_NEWEST)
+WRITER_BATCH_SIZE = 512  # async_*日志后台线程每次批量输出的最大数量
+
+BUFFER_BYTES = 64 * 1024  # 日志文件缓冲区的默认大小
+FLUSH_INTERVAL = 1.0  # 日志文件缓冲区的默认写入间隔秒数
+MMAP_SEGMENT_BYTES = 16 * 1024 * 1024  # mmap日志文件不轮转时每次扩大的字节数
+
+FORMAT_TEXT = "text"  # 日志文件输出文本格式
+FORMAT_JSON = "json"  # 日志文件每行输出一个json
+FORMAT_BINARY = "binary"  # 日志文件使用二进制模板格式, 通过aelog decode还原
+FORMATS = (FORMAT_TEXT, FORMAT_JSON, FORMAT_BINARY)
+# 文本日志文件的格式, aelog decode还原二进制日志时也使用该格式
+FILE_LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(context_text)s%(message)s"
+FILE_DATE_FORMAT = "[%Y-%m-%d %H:%M:%S %z]"
+
+# 按时间轮转的周期, 对应TimedRotatingFileHandler的when参数
+ROTATE_WHENS = {"hourly": "H", "daily": "D", "midnight": "MIDNIGHT"}
+COMPRESS_GZIP = "gzip"  # 轮转后的日志文件使用gzip压缩
+COMPRESS_ZSTD = "zstd"  # 轮转后的日志文件使用zstd压缩, 需要安装zstandard
+COMPRESS_SUFFIXES = {COMPRESS_GZIP: ".gz", COMPRESS_ZSTD: ".zst"}
+
+RATE_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0}  # 限流配置的周期单位
+SUPPRESS_SUMMARY_INTERVAL = 60.0  # 汇总输出限流丢弃数量的间隔秒数
+LIMITER_SITES = 4096  # 限流记录的调用位置数量上限, 超过时清空重新计数
+DEDUP_WINDOW = 10.0  # 重复日志合并的时间窗口秒数
+DEDUP_SIZE = 1024  # 重复日志合并记录的日志指纹数量
+RING_SIZE = 200  # 环形缓冲区中每个线程或task保存的日志数量
+RING_BUFFERS = 1024  # 环形缓冲区的最大数量
+DURATION_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)  # 统计耗时直方图的分桶上限秒数
+PROFILE_INTERVAL = 60.0  # 调用位置统计报告写入文件的间隔秒数
+PROFILE_TOP = 20  # 调用位置统计报告中的调用位置数量
+
+SHIP_FORMAT_NDJSON = "ndjson"  # 发送到收集端时每行一个json
+SHIP_FORMAT_SYSLOG = "syslog"  # 发送到收集端时使用RFC 5425 octet counting的syslog格式
+SHIP_FORMATS = (SHIP_FORMAT_NDJSON, SHIP_FORMAT_SYSLOG)
+SHIP_BATCH_SIZE = 500  # 每批最多发送的日志数量
+SHIP_BATCH_BYTES = 256 * 1024  # 每批最多发送的字节数
+SHIP_BACKOFF_MAX = 30.0  # 重连收集端的最大间隔秒数
+SHIP_TIMEOUT = 5.0  # 连接和发送的超时秒数
+SHIP_SPILL_BYTES = MAX_BYTES  # 收集端不可用时spill文件的大小上限
+
+INDEX_SUFFIX = ".idx"  # 日志文件时间索引的后缀
+INDEX_BYTES = 64 * 1024  # 推荐的时间索引间隔字节数
+INDEX_SLACK = 10.0  # 查询时容忍的日志时间乱序秒数, 比如async_*和队列模式的写入延迟
+READER_CHUNK_BYTES = 1024 * 1024  # 读取日志文件时每次读取的字节数
+READER_INTERVAL = 0.5  # 跟随读取日志文件时检查新日志和轮转的间隔秒数
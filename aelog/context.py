@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午7:30
+"""
+import logging
+from contextvars import ContextVar, Token
+from typing import Dict
+
+__all__ = ("bind", "unbind", "get_context")
+
+# 绑定的上下文字段, 每次绑定时生成新的字典, 不会影响其他task或线程中已经绑定的上下文
+_context: ContextVar = ContextVar("aelog_context", default={})
+
+
+def bind(**kwargs) -> Token:
+    """
+    绑定上下文字段, 比如request_id, 之后当前task或线程输出的日志都会带上这些字段
+    Args:
+        kwargs: 上下文字段
+    Returns:
+        contextvars的token, 可以用于恢复绑定之前的上下文
+    """
+    return _context.set({**_context.get(), **kwargs})
+
+
+def unbind(*keys):
+    """
+    解除绑定的上下文字段
+    Args:
+        keys: 上下文字段名称
+    Returns:
+
+    """
+    _context.set({key: value for key, value in _context.get().items() if key not in keys})
+
+
+def get_context() -> Dict:
+    """
+    获取当前绑定的上下文字段
+    Args:
+
+    Returns:
+
+    """
+    return _context.get()
+
+
+class ContextFilter(logging.Filter):
+    """
+    为日志记录渲染上下文字段, aelog生成记录时已经保存了调用方的上下文, 其他logger的记录使用当前的上下文.
+
+    渲染结果保存在记录的context_text属性中, 多个handler共用, 没有上下文时为空字符串.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        设置记录的context和context_text属性
+        Args:
+            record: log record
+        Returns:
+
+        """
+        if not hasattr(record, "context_text"):
+            context = getattr(record, "context", None)
+            if context is None:
+                context = record.context = _context.get()
+            record.context_text = "".join(f"{key}={value} " for key, value in context.items())
+        return True
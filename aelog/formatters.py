@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午5:05
+"""
+import builtins
+import json
+import logging
+import traceback
+from collections import OrderedDict
+from typing import Dict, List
+
+from .consts import TRACEBACK_CACHE_SIZE
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+__all__ = ("PlainFormatter", "JsonFormatter", "format_exception")
+
+_CAUSE_MESSAGE = "\nThe above exception was the direct cause of the following exception:\n\n"
+_CONTEXT_MESSAGE = "\nDuring handling of the above exception, another exception occurred:\n\n"
+# ExceptionGroup的嵌套格式交给标准库处理
+_EXCEPTION_GROUP = getattr(builtins, "BaseExceptionGroup", ())
+
+# 调用栈的代码位置到格式化结果的LRU缓存, 相同位置抛出的异常不再重复遍历调用栈和读取源码
+_stack_cache: OrderedDict = OrderedDict()
+
+# LogRecord自带的属性, 其余的属性作为extra字段输出
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message", "asctime", "sep", "_message", "taskName", "context", "context_text"}
+
+
+def _dumps(data: Dict) -> str:
+    """
+    序列化为json, 安装了orjson时使用orjson
+    Args:
+        data: 日志数据
+    Returns:
+
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode("utf8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _format_stack(value: BaseException, tb) -> str:
+    """
+    格式化异常的调用栈, 按每一层的(code object, 指令位置)缓存
+    Args:
+        value: 异常
+        tb: 异常的traceback
+    Returns:
+
+    """
+    key = []
+    walk_tb = tb
+    while walk_tb is not None:
+        key.append((walk_tb.tb_frame.f_code, walk_tb.tb_lasti))
+        walk_tb = walk_tb.tb_next
+    key = tuple(key)
+    try:
+        stack = _stack_cache[key]
+        _stack_cache.move_to_end(key)
+        return stack
+    except KeyError:
+        # 使用TracebackException提取调用栈, 和标准库一样包含3.11之后的错误位置标记
+        stack = "".join(traceback.TracebackException(type(value), value, tb).stack.format())
+        if len(_stack_cache) >= TRACEBACK_CACHE_SIZE:
+            try:
+                _stack_cache.popitem(last=False)
+            except KeyError:  # pragma: no cover, 其他线程已经淘汰
+                pass
+        _stack_cache[key] = stack
+        return stack
+
+
+def _format_chain(value: BaseException, tb, seen: set) -> List[str]:
+    """
+    按标准库的顺序格式化异常链, 先输出cause或者context
+    Args:
+        value: 异常
+        tb: 异常的traceback
+        seen: 已经输出的异常, 避免循环引用
+    Returns:
+
+    """
+    seen.add(id(value))
+    lines = []
+    cause, context = value.__cause__, value.__context__
+    if cause is not None and id(cause) not in seen:
+        lines.extend(_format_chain(cause, cause.__traceback__, seen))
+        lines.append(_CAUSE_MESSAGE)
+    elif context is not None and not value.__suppress_context__ and id(context) not in seen:
+        lines.extend(_format_chain(context, context.__traceback__, seen))
+        lines.append(_CONTEXT_MESSAGE)
+    if tb is not None:
+        lines.append("Traceback (most recent call last):\n")
+        lines.append(_format_stack(value, tb))
+    lines.extend(traceback.format_exception_only(type(value), value))
+    return lines
+
+
+def format_exception(ei) -> str:
+    """
+    格式化异常信息, 结果和logging.Formatter.formatException相同.
+
+    调用栈部分按代码位置缓存, 相同位置反复抛出的异常只需要格式化异常消息.
+    Args:
+        ei: exc_info
+    Returns:
+
+    """
+    value, tb = ei[1], ei[2]
+    if value is None or isinstance(value, _EXCEPTION_GROUP):
+        text = "".join(traceback.format_exception(ei[0], value, tb))
+    else:
+        text = "".join(_format_chain(value, tb, set()))
+    return text[:-1] if text[-1:] == "\n" else text
+
+
+class PlainFormatter(logging.Formatter):
+    """
+    日志文件使用的无颜色formatter, 时间格式化结果按秒缓存, 同一秒内的日志不再重复调用strftime.
+    """
+
+    def __init__(self, fmt: str = None, datefmt: str = None, style: str = "%"):
+        """
+        日志文件使用的无颜色formatter
+        Args:
+            fmt: 日志格式
+            datefmt: 时间格式, 为None时时间中包含毫秒不做缓存
+            style: 格式的类型
+        Returns:
+
+        """
+        super().__init__(fmt, datefmt, style)
+        self._uses_time = self._style.usesTime()
+        self._time_cache = (None, "")
+
+    def usesTime(self) -> bool:
+        """
+        是否需要格式化时间, 初始化时已经计算
+        Args:
+
+        Returns:
+
+        """
+        return self._uses_time
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        """
+        格式化时间, 同一秒内直接返回缓存的结果
+        Args:
+            record: log record
+            datefmt: 时间格式
+        Returns:
+
+        """
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, asctime = self._time_cache
+        if second != cached_second:
+            asctime = super().formatTime(record, datefmt)
+            self._time_cache = (second, asctime)
+        return asctime
+
+    def formatException(self, ei) -> str:
+        """
+        格式化异常信息, 调用栈按代码位置缓存
+        Args:
+            ei: exc_info
+        Returns:
+
+        """
+        return format_exception(ei)
+
+
+class JsonFormatter(PlainFormatter):
+    """
+    每条日志输出为一行json, 包含时间, 级别, logger名称, 函数, 行号, 消息, 异常以及extra字段.
+    """
+
+    def __init__(self, fmt: str = None, datefmt: str = None, style: str = "%"):
+        """
+        每条日志输出为一行json
+        Args:
+            fmt: 不使用, 兼容dictConfig的参数
+            datefmt: 时间格式, dictConfig没有配置时传入None, 默认为ISO 8601格式
+            style: 不使用, 兼容dictConfig的参数
+        Returns:
+
+        """
+        super().__init__(None, datefmt or "%Y-%m-%dT%H:%M:%S%z", style)
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        格式化为json
+        Args:
+            record: log record
+        Returns:
+
+        """
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "name": record.name,
+            "func": record.funcName,
+            "lineno": record.lineno,
+            "message": record.getMessage(),
+        }
+        context = getattr(record, "context", None)
+        if context:
+            for key, value in context.items():
+                data.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        extra_keys = record.__dict__.keys() - _RECORD_ATTRS
+        if extra_keys:
+            for key in sorted(extra_keys):
+                data[key] = record.__dict__[key]
+        return _dumps(data)
+
+
+def __getattr__(name: str):
+    """
+    ColoredFormatter依赖colorlog, 使用时才导入, 只输出到文件时不需要导入colorlog
+    Args:
+        name: 属性名称
+    Returns:
+
+    """
+    if name == "ColoredFormatter":
+        from .colored import ColoredFormatter
+        return ColoredFormatter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
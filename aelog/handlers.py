@@ -0,0 +1,931 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午2:10
+"""
+import gzip
+import logging
+import mmap
+import os
+import queue
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, windows
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from .consts import (BUFFER_BYTES, COMPRESS_GZIP, COMPRESS_SUFFIXES, COMPRESS_ZSTD, FLUSH_INTERVAL,
+                     MMAP_SEGMENT_BYTES, QUEUE_POLICIES, QUEUE_POLICY_BLOCK, QUEUE_POLICY_DROP_NEWEST, QUEUE_SIZE,
+                     RING_BUFFERS, RING_SIZE)
+
+__all__ = ("AelogQueueHandler", "BufferedRotatingFileHandler", "MultiprocessRotatingFileHandler",
+           "CompressRotatingFileHandler", "CompressTimedRotatingFileHandler", "RingBufferHandler",
+           "MmapRotatingFileHandler", "open_log_file")
+
+_compress_executor: Optional[ThreadPoolExecutor] = None
+_compress_lock = threading.Lock()
+
+
+def compress_file(source: str, dest: str, compress: str):
+    """
+    压缩日志文件, 先写入临时文件再改名, 完成后删除源文件
+    Args:
+        source: 源文件
+        dest: 压缩后的文件
+        compress: 压缩方式, gzip或zstd
+    Returns:
+
+    """
+    tmp_dest = f"{dest}.tmp"
+    with open(source, "rb") as src:
+        if compress == COMPRESS_ZSTD:
+            with open(tmp_dest, "wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            with gzip.open(tmp_dest, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(tmp_dest, dest)
+    os.remove(source)
+
+
+def open_log_file(filename: str):
+    """
+    以二进制只读方式打开日志文件, 按后缀透明解压gzip和zstd压缩的备份文件
+    Args:
+        filename: 日志文件
+    Returns:
+        文件对象
+    """
+    if filename.endswith(COMPRESS_SUFFIXES[COMPRESS_GZIP]):
+        return gzip.open(filename, "rb")
+    if filename.endswith(COMPRESS_SUFFIXES[COMPRESS_ZSTD]):
+        if zstandard is None:
+            raise ImportError("读取zstd压缩的日志文件需要安装zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+    return open(filename, "rb")
+
+
+def _reset_compress_executor():
+    """
+    fork之后子进程中没有压缩线程, 丢弃父进程的线程池
+    Args:
+
+    Returns:
+
+    """
+    global _compress_executor, _compress_lock
+    _compress_executor, _compress_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_compress_executor)
+
+
+def _submit_compress(source: str, dest: str, compress: str) -> Future:
+    """
+    在后台线程中压缩日志文件, 第一次使用时才创建线程
+    Args:
+        source: 源文件
+        dest: 压缩后的文件
+        compress: 压缩方式, gzip或zstd
+    Returns:
+
+    """
+    global _compress_executor
+    with _compress_lock:
+        if _compress_executor is None:
+            _compress_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aelog-compress")
+    return _compress_executor.submit(compress_file, source, dest, compress)
+
+
+class CompressRotatorMixin(object):
+    """
+    轮转后在后台线程中压缩备份文件, 触发轮转的日志调用只做一次改名.
+    """
+
+    compress: Optional[str] = None
+    _pending_compress: Optional[Future] = None
+
+    def setup_compress(self, compress: Optional[str]):
+        """
+        设置压缩方式, 备份文件名加上压缩后缀
+        Args:
+            compress: 压缩方式, gzip或zstd, 为None时不压缩
+        Returns:
+
+        """
+        if compress is None:
+            return
+        if compress not in COMPRESS_SUFFIXES:
+            raise ValueError(f"参数compress必须为{tuple(COMPRESS_SUFFIXES)}中的一个")
+        if compress == COMPRESS_ZSTD and zstandard is None:
+            raise ImportError("zstd压缩需要安装zstandard")
+        self.compress = compress
+        self.namer = self._compress_name
+        self.rotator = self._compress_rotate
+
+    def _compress_name(self, name: str) -> str:
+        """
+        压缩后的备份文件名
+        Args:
+            name: 备份文件名
+        Returns:
+
+        """
+        return f"{name}{COMPRESS_SUFFIXES[self.compress]}"
+
+    def _compress_rotate(self, source: str, dest: str):
+        """
+        改名后提交到后台线程压缩
+        Args:
+            source: 当前日志文件
+            dest: 压缩后的备份文件
+        Returns:
+
+        """
+        plain_dest = dest[:-len(COMPRESS_SUFFIXES[self.compress])]
+        if os.path.exists(source):
+            os.rename(source, plain_dest)
+            self._pending_compress = _submit_compress(plain_dest, dest, self.compress)
+
+    def wait_compress(self):
+        """
+        等待上一次轮转的压缩完成, 下一次轮转移动备份文件之前调用, 通常早已完成
+        Args:
+
+        Returns:
+
+        """
+        pending, self._pending_compress = self._pending_compress, None
+        if pending is not None:
+            try:
+                pending.result()
+            except Exception:  # pragma: no cover, 压缩失败时保留未压缩的备份文件
+                pass
+
+    def close(self):
+        """
+        关闭时等待正在进行的压缩完成
+        Args:
+
+        Returns:
+
+        """
+        super().close()
+        self.wait_compress()
+
+
+class CompressRotatingFileHandler(CompressRotatorMixin, RotatingFileHandler):
+    """
+    按大小轮转, 并在后台线程中压缩备份文件的handler
+    """
+
+    def __init__(self, filename: str, mode: str = "a", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, compress: str = COMPRESS_GZIP):
+        """
+        按大小轮转, 并在后台线程中压缩备份文件的handler
+        Args:
+            filename: log file
+            mode: file mode
+            maxBytes: log file max bytes
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            compress: 压缩方式, gzip或zstd
+        Returns:
+
+        """
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self.setup_compress(compress)
+
+    def doRollover(self):
+        """
+        等待上一次的压缩完成后轮转
+        Args:
+
+        Returns:
+
+        """
+        self.wait_compress()
+        super().doRollover()
+
+
+class CompressTimedRotatingFileHandler(CompressRotatorMixin, TimedRotatingFileHandler):
+    """
+    按时间轮转, 可以在后台线程中压缩备份文件的handler
+    """
+
+    def __init__(self, filename: str, when: str = "MIDNIGHT", interval: int = 1, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, utc: bool = False, compress: str = None):
+        """
+        按时间轮转, 可以在后台线程中压缩备份文件的handler
+        Args:
+            filename: log file
+            when: 轮转的周期, H, D或MIDNIGHT
+            interval: 轮转的间隔
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            utc: 是否使用utc时间
+            compress: 压缩方式, gzip或zstd, 为None时不压缩
+        Returns:
+
+        """
+        super().__init__(filename, when, interval, backupCount, encoding, delay, utc)
+        self.setup_compress(compress)
+
+    def doRollover(self):
+        """
+        等待上一次的压缩完成后轮转
+        Args:
+
+        Returns:
+
+        """
+        self.wait_compress()
+        super().doRollover()
+
+
+def _configured_handler(name: str) -> logging.Handler:
+    """
+    获取dictConfig中已经配置的handler
+    Args:
+        name: handler名称
+    Returns:
+
+    """
+    # noinspection PyProtectedMember
+    handler = logging._handlers.get(name)
+    if handler is None:
+        # dictConfig遇到该异常时会在其他handler配置完成后再次配置
+        raise ValueError(f"handler {name} 不存在") from TypeError("target not configured yet")
+    return handler
+
+
+class _QueueListener(QueueListener):
+    """
+    队列满时停止信号也要能够放入队列
+    """
+
+    def enqueue_sentinel(self):
+        """
+        阻塞放入停止信号, 后台线程会先处理完队列中剩余的日志
+        Args:
+
+        Returns:
+
+        """
+        self.queue.put(self._sentinel)
+
+
+class AelogQueueHandler(QueueHandler):
+    """
+    把日志记录放入内存队列, 由一个后台线程统一写入console和文件handler, 日志调用方不会阻塞在文件IO上.
+    """
+
+    def __init__(self, handlers: List[str], maxsize: int = QUEUE_SIZE, policy: str = QUEUE_POLICY_BLOCK):
+        """
+        后台线程写日志的队列handler
+        Args:
+            handlers: 后台线程中实际输出日志的handler名称, 必须是dictConfig中已经配置的handler
+            maxsize: 队列的最大长度, 小于等于0时不限制
+            policy: 队列满时的处理策略, block, drop_oldest或drop_newest
+        Returns:
+
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"参数policy必须为{QUEUE_POLICIES}中的一个")
+        targets = [_configured_handler(name) for name in handlers]
+        super().__init__(queue.Queue(maxsize))
+        self.policy = policy
+        self.dropped = 0  # 队列满时丢弃的日志数量
+        self.listener = _QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        同一进程中直接传递日志记录, 只在调用方生成消息, 避免参数在后台线程格式化之前被修改
+        Args:
+            record: log record
+        Returns:
+
+        """
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        按照队列满时的策略放入队列, emit时已经持有handler的锁
+        Args:
+            record: log record
+        Returns:
+
+        """
+        if self.policy == QUEUE_POLICY_BLOCK:
+            self.queue.put(record)
+        elif self.policy == QUEUE_POLICY_DROP_NEWEST:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(record)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def close(self):
+        """
+        停止后台线程, 停止前会把队列中剩余的日志全部写完
+        Args:
+
+        Returns:
+
+        """
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    把低于flush_level的日志记录保存在每个线程(python3.12之后为每个task)固定大小的环形缓冲区中, 不格式化也不写文件.
+
+    出现flush_level以上的日志时, 把同一线程或task缓冲区中最近的日志交给target handler输出, 然后清空缓冲区.
+    """
+
+    def __init__(self, target: str, capacity: int = RING_SIZE, flush_level: int = logging.ERROR,
+                 max_buffers: int = RING_BUFFERS):
+        """
+        环形缓冲区handler
+        Args:
+            target: 输出缓冲日志的handler名称, 必须是dictConfig中已经配置的handler, 比如错误日志文件
+            capacity: 每个缓冲区保存的日志数量
+            flush_level: 触发输出缓冲日志的级别
+            max_buffers: 缓冲区的最大数量, 超过时淘汰最久没有使用的缓冲区
+        Returns:
+
+        """
+        if capacity <= 0:
+            raise ValueError("参数capacity必须大于0")
+        self.target = _configured_handler(target)
+        super().__init__()
+        self.capacity = capacity
+        self.flush_level = logging._checkLevel(flush_level)
+        self.max_buffers = max_buffers
+        # (线程, task)到[预先分配的记录列表, 下一个写入位置, 已写入数量]
+        self.buffers: OrderedDict = OrderedDict()
+
+    def emit(self, record: logging.LogRecord):
+        """
+        保存日志记录或者输出缓冲的日志, handle时已经持有handler的锁
+        Args:
+            record: log record
+        Returns:
+
+        """
+        # 使用记录上的线程和task, async_*的日志在后台线程输出时也能找到调用方的缓冲区
+        key = (record.thread, getattr(record, "taskName", None))
+        if record.levelno >= self.flush_level:
+            buffer = self.buffers.pop(key, None)
+            if buffer is not None:
+                self.dump(buffer)
+            return
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            if len(self.buffers) >= self.max_buffers:
+                self.buffers.popitem(last=False)
+            buffer = self.buffers[key] = [[None] * self.capacity, 0, 0]
+        else:
+            self.buffers.move_to_end(key)
+        records, index, size = buffer
+        records[index] = record
+        buffer[1] = (index + 1) % self.capacity
+        buffer[2] = min(size + 1, self.capacity)
+
+    def dump(self, buffer: List):
+        """
+        按时间顺序把缓冲区中的日志交给target handler输出, 不受target handler级别的限制
+        Args:
+            buffer: 缓冲区
+        Returns:
+
+        """
+        records, index, size = buffer
+        start = (index - size) % self.capacity
+        for offset in range(size):
+            self.target.handle(records[(start + offset) % self.capacity])
+
+    def close(self):
+        """
+        丢弃所有缓冲的日志
+        Args:
+
+        Returns:
+
+        """
+        self.acquire()
+        try:
+            self.buffers.clear()
+        finally:
+            self.release()
+        super().close()
+
+
+class BufferedRotatingFileHandler(CompressRotatorMixin, RotatingFileHandler):
+    """
+    带缓冲的日志文件handler, 编码后的日志先放入缓冲区, 达到缓冲大小, 超过刷新间隔或者遇到ERROR以上级别时一次性写入文件.
+    """
+
+    def __init__(self, filename: str, mode: str = "a", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, buffer_bytes: int = BUFFER_BYTES,
+                 flush_interval: float = FLUSH_INTERVAL, flush_level: int = logging.ERROR, compress: str = None):
+        """
+        带缓冲的日志文件handler
+        Args:
+            filename: log file
+            mode: file mode
+            maxBytes: log file max bytes
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            buffer_bytes: 缓冲区大小
+            flush_interval: 定时写入文件的间隔秒数, 小于等于0时不定时写入
+            flush_level: 大于等于该级别的日志会立即写入文件
+            compress: 备份文件的压缩方式, gzip或zstd, 为None时不压缩
+        Returns:
+
+        """
+        self.buffer = bytearray()
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.file_size = 0
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self.setup_compress(compress)
+        self._flush_stopped = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, name="aelog-flush", daemon=True).start()
+
+    def _open(self):
+        """
+        以二进制方式打开文件, 缓冲区中是已经编码的内容
+        Args:
+
+        Returns:
+
+        """
+        stream = open(self.baseFilename, self.mode if "b" in self.mode else f"{self.mode}b")
+        self.file_size = stream.seek(0, 2)
+        return stream
+
+    def _flush_periodically(self):
+        """
+        定时把缓冲区写入文件
+        Args:
+
+        Returns:
+
+        """
+        while not self._flush_stopped.wait(self.flush_interval):
+            self.flush()
+
+    def emit(self, record: logging.LogRecord):
+        """
+        编码后放入缓冲区, 满足条件时写入文件
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            data = f"{self.format(record)}{self.terminator}".encode(self.encoding or "utf-8",
+                                                                       getattr(self, "errors", None) or "strict")
+            if self.maxBytes > 0 and self.file_size + len(self.buffer) + len(data) >= self.maxBytes:
+                self.doRollover()
+            self.buffer += data
+            if len(self.buffer) >= self.buffer_bytes or record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """
+        把缓冲区写入文件
+        Args:
+
+        Returns:
+
+        """
+        self.acquire()
+        try:
+            if self.buffer:
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(self.buffer)
+                self.stream.flush()
+                self.file_size += len(self.buffer)
+                del self.buffer[:]
+        finally:
+            self.release()
+
+    def doRollover(self):
+        """
+        轮转之前先把缓冲区写入当前文件
+        Args:
+
+        Returns:
+
+        """
+        self.flush()
+        self.wait_compress()
+        super().doRollover()
+        if self.stream is None:
+            self.file_size = 0
+
+    def close(self):
+        """
+        写入缓冲区并停止定时写入
+        Args:
+
+        Returns:
+
+        """
+        self._flush_stopped.set()
+        self.acquire()
+        try:
+            self.flush()
+            super().close()
+        finally:
+            self.release()
+
+
+class MultiprocessRotatingFileHandler(BufferedRotatingFileHandler):
+    """
+    多进程共用同一个日志文件的handler, 比如sanic和gunicorn的多个worker.
+
+    每个进程以O_APPEND方式打开文件, 写入和轮转时持有文件锁(日志文件名.lock), 写入前检查文件是否已经被其他进程轮转,
+    轮转后重新打开, 所以不会丢失或者重复日志. 配合buffer_bytes可以减少加锁的次数, 配合队列模式可以不阻塞调用方.
+    """
+
+    def __init__(self, filename: str, mode: str = "a", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, buffer_bytes: int = 0, flush_interval: float = 0,
+                 flush_level: int = logging.ERROR, compress: str = None):
+        """
+        多进程共用同一个日志文件的handler
+        Args:
+            filename: log file
+            mode: file mode
+            maxBytes: log file max bytes
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            buffer_bytes: 缓冲区大小, 默认每条日志立即写入
+            flush_interval: 定时写入文件的间隔秒数, 小于等于0时不定时写入
+            flush_level: 大于等于该级别的日志会立即写入文件
+            compress: 备份文件的压缩方式, gzip或zstd, 为None时不压缩
+        Returns:
+
+        """
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("多进程日志文件只支持POSIX系统")
+        self._pid = os.getpid()
+        self._lock_stream = None
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay, buffer_bytes, flush_interval,
+                         flush_level, compress)
+
+    def _open(self):
+        """
+        以O_APPEND无缓冲的方式打开文件, 每次写入都是一次write调用
+        Args:
+
+        Returns:
+
+        """
+        if self._lock_stream is None:
+            self._lock_stream = open(f"{self.baseFilename}.lock", "ab")
+        return open(self.baseFilename, "ab", buffering=0)
+
+    def _reopen_after_fork(self):
+        """
+        fork之后子进程重新打开文件和锁文件, flock的锁是和父进程共享的
+        Args:
+
+        Returns:
+
+        """
+        self._pid = os.getpid()
+        for stream in (self.stream, self._lock_stream):
+            if stream is not None:
+                stream.close()
+        self._lock_stream = None
+        self.stream = self._open()
+        if self.flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, name="aelog-flush", daemon=True).start()
+
+    def emit(self, record: logging.LogRecord):
+        """
+        编码后放入缓冲区, 满足条件时写入文件, 轮转在写入文件时检查
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            data = f"{self.format(record)}{self.terminator}".encode(self.encoding or "utf-8",
+                                                                       getattr(self, "errors", None) or "strict")
+            self.buffer += data
+            if len(self.buffer) >= self.buffer_bytes or record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """
+        持有文件锁写入缓冲区, 文件被其他进程轮转后重新打开, 超过大小时轮转
+        Args:
+
+        Returns:
+
+        """
+        self.acquire()
+        try:
+            if not self.buffer:
+                return
+            if self._pid != os.getpid():
+                self._reopen_after_fork()
+            elif self.stream is None:
+                self.stream = self._open()
+            fcntl.flock(self._lock_stream.fileno(), fcntl.LOCK_EX)
+            try:
+                stat = os.fstat(self.stream.fileno())
+                try:
+                    path_stat = os.stat(self.baseFilename)
+                except FileNotFoundError:
+                    path_stat = None
+                if path_stat is None or (path_stat.st_ino, path_stat.st_dev) != (stat.st_ino, stat.st_dev):
+                    self.stream.close()
+                    self.stream = self._open()
+                    stat = os.fstat(self.stream.fileno())
+                if 0 < self.maxBytes <= stat.st_size + len(self.buffer) and stat.st_size > 0:
+                    RotatingFileHandler.doRollover(self)
+                    # 其他进程可能随后轮转, 压缩必须在释放文件锁之前完成
+                    self.wait_compress()
+                    if self.stream is None:
+                        self.stream = self._open()
+                view = memoryview(self.buffer)
+                while view:
+                    view = view[self.stream.write(view):]
+                view.release()
+                del self.buffer[:]
+            finally:
+                fcntl.flock(self._lock_stream.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.release()
+
+    def doRollover(self):
+        """
+        轮转只能在持有文件锁时进行
+        Args:
+
+        Returns:
+
+        """
+        self.flush()
+
+    def close(self):
+        """
+        写入缓冲区并关闭锁文件
+        Args:
+
+        Returns:
+
+        """
+        self.acquire()
+        try:
+            super().close()
+            if self._lock_stream is not None:
+                self._lock_stream.close()
+                self._lock_stream = None
+        finally:
+            self.release()
+
+
+class _MmapSegment(object):
+    """
+    预先分配大小并映射到内存的日志文件, 写入时直接复制到映射区域, 关闭时截断未使用的部分
+    """
+
+    def __init__(self, filename: str, size: int):
+        """
+        打开或者创建日志文件, 已有的文件从最后一个完整的行之后继续写入
+        Args:
+            filename: log file
+            size: 预先分配的大小
+        Returns:
+
+        """
+        self.fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            file_size = os.fstat(self.fd).st_size
+            self.size = max(size, file_size, 1)
+            self._allocate(self.size)
+            self.mm = mmap.mmap(self.fd, self.size)
+        except Exception:
+            os.close(self.fd)
+            raise
+        self.offset = self._recover(file_size)
+
+    def _allocate(self, size: int):
+        """
+        扩大文件并尽量预先分配磁盘空间
+        Args:
+            size: 文件大小
+        Returns:
+
+        """
+        os.ftruncate(self.fd, size)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.fd, 0, size)
+            except OSError:  # pragma: no cover, 文件系统不支持时使用稀疏文件
+                pass
+
+    def _recover(self, file_size: int) -> int:
+        """
+        找到最后一个完整的行, 异常退出时文件末尾是预先分配的空字节或者写了一半的行
+        Args:
+            file_size: 打开之前的文件大小
+        Returns:
+            写入位置
+        """
+        if file_size == 0:
+            return 0
+        if self.mm[file_size - 1:file_size] == b"\n":
+            return file_size
+        offset = self.mm.rfind(b"\n", 0, file_size) + 1
+        end = file_size
+        while end > offset and self.mm[end - 1] == 0:
+            end -= 1
+        # 清除最后一个不完整的行, 下次写入会从这里开始
+        self.mm[offset:end] = bytes(end - offset)
+        return offset
+
+    def free(self) -> int:
+        """
+        剩余可以写入的字节数
+        Args:
+
+        Returns:
+
+        """
+        return self.size - self.offset
+
+    def grow(self, size: int):
+        """
+        扩大文件和映射区域, 用于不轮转或者单条日志超过文件大小的情况
+        Args:
+            size: 新的文件大小
+        Returns:
+
+        """
+        self.mm.close()
+        self._allocate(size)
+        self.size = size
+        self.mm = mmap.mmap(self.fd, size)
+
+    def write(self, data: bytes):
+        """
+        复制到映射区域并移动写入位置
+        Args:
+            data: 编码后的日志
+        Returns:
+
+        """
+        end = self.offset + len(data)
+        self.mm[self.offset:end] = data
+        self.offset = end
+
+    def flush(self):
+        """
+        映射区域由操作系统写回磁盘, 进程异常退出也不会丢失, 关闭时才同步
+        Args:
+
+        Returns:
+
+        """
+
+    def close(self):
+        """
+        同步映射区域并截断未使用的部分
+        Args:
+
+        Returns:
+
+        """
+        try:
+            self.mm.flush()
+            self.mm.close()
+            os.ftruncate(self.fd, self.offset)
+        finally:
+            os.close(self.fd)
+
+
+class MmapRotatingFileHandler(CompressRotatorMixin, RotatingFileHandler):
+    """
+    使用mmap写入的日志文件handler, 每个文件预先分配maxBytes大小并映射到内存, 写日志只是一次内存复制, 不需要write系统调用.
+
+    文件写满时轮转, 关闭时截断未使用的部分. 进程异常退出后重新打开时从最后一个完整的行之后继续写入.
+    正在写入的文件末尾是预先分配的空字节. 只支持单个进程写入.
+    """
+
+    def __init__(self, filename: str, mode: str = "a", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, compress: str = None):
+        """
+        使用mmap写入的日志文件handler
+        Args:
+            filename: log file
+            mode: 只支持追加写入, 兼容dictConfig的参数
+            maxBytes: 每个文件的大小, 为0时不轮转, 文件按MMAP_SEGMENT_BYTES逐步扩大
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            compress: 备份文件的压缩方式, gzip或zstd, 为None时不压缩
+        Returns:
+
+        """
+        self.maxBytes = maxBytes  # 不延迟打开时父类初始化中就会打开文件
+        super().__init__(filename, "a", maxBytes, backupCount, encoding, delay)
+        self.setup_compress(compress)
+
+    def _open(self) -> _MmapSegment:
+        """
+        打开并映射日志文件
+        Args:
+
+        Returns:
+
+        """
+        return _MmapSegment(self.baseFilename, self.maxBytes if self.maxBytes > 0 else MMAP_SEGMENT_BYTES)
+
+    def emit(self, record: logging.LogRecord):
+        """
+        编码后写入映射区域, 剩余空间不足时轮转
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            data = f"{self.format(record)}{self.terminator}".encode(self.encoding or "utf-8",
+                                                                       getattr(self, "errors", None) or "strict")
+            if self.stream is None:
+                self.stream = self._open()
+            if len(data) > self.stream.free():
+                if self.maxBytes > 0 and self.stream.offset > 0:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                if len(data) > self.stream.free():
+                    self.stream.grow(self.stream.offset + max(len(data), self.maxBytes or MMAP_SEGMENT_BYTES))
+            self.stream.write(data)
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        """
+        等待上一次的压缩完成后轮转
+        Args:
+
+        Returns:
+
+        """
+        self.wait_compress()
+        super().doRollover()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午6:10
+"""
+import bisect
+import glob
+import heapq
+import json
+import logging
+import os
+import re
+import struct
+import time
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .consts import COMPRESS_SUFFIXES, FILE_DATE_FORMAT, FILE_LOG_FORMAT, INDEX_SLACK, INDEX_SUFFIX, RATE_UNITS
+from .formatters import PlainFormatter
+from .handlers import CompressRotatingFileHandler, open_log_file
+
+__all__ = ("TimeIndexMixin", "IndexedRotatingFileHandler", "list_segments", "read_index", "query", "parse_time")
+
+# 索引条目: 日志记录的时间戳和记录在日志文件中的字节偏移量
+_ENTRY = struct.Struct("<dQ")
+
+# 文本日志行的开头, 时间和级别, 不匹配的行属于上一条日志, 比如异常的调用栈
+_TEXT_HEAD = re.compile(rb"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d [+-]\d{4})\] \[(\w+)\] ")
+_TIME_UNITS = {**RATE_UNITS, "d": 86400.0}
+
+
+class TimeIndexMixin(object):
+    """
+    为按大小轮转的日志文件维护稀疏的时间索引文件(日志文件名加.idx), 每写入index_bytes字节记录一次日志的时间和偏移量.
+
+    索引文件和日志文件一起轮转, 压缩的备份文件的偏移量为解压后的偏移量.
+    """
+
+    index_bytes: int = 0
+    _index_stream: Optional[BinaryIO] = None
+    _index_next: int = 0
+
+    def setup_index(self, index_bytes: int):
+        """
+        设置索引的间隔字节数, 并从已有的索引文件继续
+        Args:
+            index_bytes: 索引的间隔字节数, 小于等于0时不维护索引
+        Returns:
+
+        """
+        self.index_bytes = index_bytes
+        if index_bytes > 0:
+            self._load_index()
+
+    def _load_index(self):
+        """
+        从已有的索引文件中读取下一个索引的位置, 日志文件已经被删除或截断时丢弃索引
+        Args:
+
+        Returns:
+
+        """
+        index_file = f"{self.baseFilename}{INDEX_SUFFIX}"
+        entries = read_index(self.baseFilename)
+        size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        if entries and entries[-1][1] < size:
+            self._index_next = entries[-1][1] + self.index_bytes
+        else:
+            self._index_next = 0
+            if os.path.exists(index_file):
+                os.remove(index_file)
+
+    def index_due(self, offset: int) -> bool:
+        """
+        当前位置是否需要写入索引
+        Args:
+            offset: 下一条日志在日志文件中的偏移量
+        Returns:
+
+        """
+        return offset >= self._index_next
+
+    def index_record(self, created: float, offset: int):
+        """
+        写入一个索引条目
+        Args:
+            created: 日志记录的时间戳
+            offset: 日志记录在日志文件中的偏移量
+        Returns:
+
+        """
+        if self._index_stream is None:
+            self._index_stream = open(f"{self.baseFilename}{INDEX_SUFFIX}", "ab")
+        self._index_stream.write(_ENTRY.pack(created, offset))
+        self._index_stream.flush()
+        self._index_next = offset + self.index_bytes
+
+    def _close_index(self):
+        """
+        关闭索引文件
+        Args:
+
+        Returns:
+
+        """
+        if self._index_stream is not None:
+            self._index_stream.close()
+            self._index_stream = None
+
+    def doRollover(self):
+        """
+        轮转日志文件后按同样的方式轮转索引文件
+        Args:
+
+        Returns:
+
+        """
+        self._close_index()
+        super().doRollover()
+        if self.index_bytes <= 0 or self.backupCount <= 0:
+            return
+        for index in range(self.backupCount - 1, 0, -1):
+            source = f"{self.rotation_filename(f'{self.baseFilename}.{index}')}{INDEX_SUFFIX}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.rotation_filename(f'{self.baseFilename}.{index + 1}')}{INDEX_SUFFIX}")
+        source = f"{self.baseFilename}{INDEX_SUFFIX}"
+        if os.path.exists(source):
+            os.replace(source, f"{self.rotation_filename(f'{self.baseFilename}.1')}{INDEX_SUFFIX}")
+        self._index_next = 0
+
+    def close(self):
+        """
+        关闭索引文件
+        Args:
+
+        Returns:
+
+        """
+        self._close_index()
+        super().close()
+
+
+class IndexedRotatingFileHandler(TimeIndexMixin, CompressRotatingFileHandler):
+    """
+    按大小轮转并维护时间索引的文本日志文件handler, 可以在后台线程中压缩备份文件
+    """
+
+    def __init__(self, filename: str, mode: str = "a", maxBytes: int = 0, backupCount: int = 0,
+                 encoding: str = None, delay: bool = False, compress: str = None, index_bytes: int = 0):
+        """
+        按大小轮转并维护时间索引的文本日志文件handler
+        Args:
+            filename: log file
+            mode: file mode
+            maxBytes: log file max bytes
+            backupCount: backup count
+            encoding: file encoding
+            delay: 第一次输出日志时才打开文件
+            compress: 备份文件的压缩方式, gzip或zstd, 为None时不压缩
+            index_bytes: 索引的间隔字节数
+        Returns:
+
+        """
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay, compress)
+        self.setup_index(index_bytes)
+
+    def emit(self, record: logging.LogRecord):
+        """
+        轮转检查之后, 写入日志之前记录索引
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            if self.index_bytes > 0:
+                offset = self.stream.tell()
+                if self.index_due(offset):
+                    self.index_record(record.created, offset)
+            logging.FileHandler.emit(self, record)
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def read_index(segment: str) -> List[Tuple[float, int]]:
+    """
+    读取日志文件的索引
+    Args:
+        segment: 日志文件, 包括轮转后的备份文件
+    Returns:
+        (时间戳, 偏移量)列表, 没有索引时为空列表
+    """
+    try:
+        with open(f"{segment}{INDEX_SUFFIX}", "rb") as fp:
+            data = fp.read()
+    except FileNotFoundError:
+        return []
+    return list(_ENTRY.iter_unpack(data[:len(data) - len(data) % _ENTRY.size]))
+
+
+def list_segments(filename: str) -> List[str]:
+    """
+    按时间顺序列出日志文件轮转后的备份文件和当前文件, 包括压缩的备份文件
+    Args:
+        filename: 当前日志文件
+    Returns:
+
+    """
+    suffixes = tuple(COMPRESS_SUFFIXES.values())
+    backups: Dict[int, str] = {}
+    for path in glob.glob(f"{glob.escape(filename)}.*"):
+        number = path[len(filename) + 1:]
+        compressed = number.endswith(suffixes)
+        if compressed:
+            number = number.rsplit(".", 1)[0]
+        # 压缩完成到删除源文件之间同时存在两个文件, 使用未压缩的文件
+        if number.isdigit() and not (compressed and int(number) in backups):
+            backups[int(number)] = path
+    segments = [backups[number] for number in sorted(backups, reverse=True)]
+    if os.path.exists(filename):
+        segments.append(filename)
+    return segments
+
+
+def parse_time(value: Union[str, float]) -> float:
+    """
+    解析查询的时间, 支持时间戳, ISO格式的时间(没有时区时为本地时间)和相对现在的时间, 比如15m, 2h, 1d
+    Args:
+        value: 时间
+    Returns:
+        时间戳
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value[-1:] in _TIME_UNITS:
+        try:
+            return time.time() - float(value[:-1]) * _TIME_UNITS[value[-1]]
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"时间{value}格式错误, 应该为时间戳, ISO格式的时间或者15m, 2h, 1d这样的相对时间")
+
+
+class _TextTime(object):
+    """
+    解析文本日志行中的时间, 同一秒的时间只解析一次
+    """
+
+    def __init__(self):
+        self.text = b""
+        self.timestamp = 0.0
+
+    def __call__(self, text: bytes) -> float:
+        if text != self.text:
+            self.timestamp = datetime.strptime(text.decode(), FILE_DATE_FORMAT[1:-1]).timestamp()
+            self.text = text
+        return self.timestamp
+
+
+def _text_entries(fp: BinaryIO) -> Iterator[Tuple[float, int, str]]:
+    """
+    从文本日志文件中读取日志, 日志的开头不是时间的行属于上一条日志
+    Args:
+        fp: 已经定位到日志开头的文件对象
+    Returns:
+        (时间戳, 级别, 日志文本)
+    """
+    parse_time_text = _TextTime()
+    entry: Optional[List] = None
+    for line in fp:
+        match = _TEXT_HEAD.match(line)
+        if match is None:
+            if entry is not None:
+                entry[2].append(line)
+            continue
+        if entry is not None:
+            yield entry[0], entry[1], b"".join(entry[2]).decode("utf-8", "replace").rstrip("\n")
+        entry = [parse_time_text(match.group(1)), logging.getLevelName(match.group(2).decode()), [line]]
+    if entry is not None:
+        yield entry[0], entry[1], b"".join(entry[2]).decode("utf-8", "replace").rstrip("\n")
+
+
+def _json_entries(fp: BinaryIO) -> Iterator[Tuple[float, int, str]]:
+    """
+    从json日志文件中读取日志
+    Args:
+        fp: 已经定位到日志开头的文件对象
+    Returns:
+        (时间戳, 级别, 日志文本)
+    """
+    for line in fp:
+        try:
+            data = json.loads(line)
+            timestamp = datetime.strptime(data["time"], "%Y-%m-%dT%H:%M:%S%z").timestamp()
+        except (ValueError, KeyError):
+            continue
+        yield timestamp, logging.getLevelName(data.get("level", "NOTSET")), line.decode("utf-8").rstrip("\n")
+
+
+def _segment_entries(segment: str, offset: int) -> Iterator[Tuple[float, int, str]]:
+    """
+    从日志文件的偏移量开始读取日志, 自动识别文本, json和二进制格式
+    Args:
+        segment: 日志文件
+        offset: 日志开头的偏移量
+    Returns:
+        (时间戳, 级别, 日志文本)
+    """
+    # aelog.binary的handler依赖本模块的TimeIndexMixin
+    from .binary import MAGIC, decode_records
+
+    with open_log_file(segment) as fp:
+        head = fp.read(len(MAGIC))
+        if head == MAGIC:
+            formatter = PlainFormatter(FILE_LOG_FORMAT, FILE_DATE_FORMAT)
+            fp.seek(0)
+            for record in decode_records(fp, offset):
+                yield record.created, record.levelno, formatter.format(record)
+            return
+        fp.seek(offset)
+        entries = _json_entries(fp) if head.startswith(b"{") else _text_entries(fp)
+        yield from entries
+
+
+def _query_file(filename: str, since: float, until: float, level: int, slack: float
+                ) -> Iterator[Tuple[float, int, str]]:
+    """
+    查询一个日志文件及其备份文件中时间范围内的日志, 通过索引跳过不在范围内的文件并定位到范围开头附近
+    Args:
+        filename: 当前日志文件
+        since: 开始时间戳
+        until: 结束时间戳
+        level: 最低级别
+        slack: 日志时间乱序的容忍秒数
+    Returns:
+        (时间戳, 级别, 日志文本)
+    """
+    segments = list_segments(filename)
+    indexes = [read_index(segment) for segment in segments]
+    for position, segment in enumerate(segments):
+        entries = indexes[position]
+        next_entries = indexes[position + 1] if position + 1 < len(indexes) else None
+        if entries and entries[0][0] > until + slack:
+            return
+        if next_entries and next_entries[0][0] < since - slack:
+            continue
+        offset = 0
+        if entries:
+            found = bisect.bisect_right([timestamp for timestamp, _ in entries], since - slack)
+            if found > 0:
+                offset = entries[found - 1][1]
+        for timestamp, levelno, text in _segment_entries(segment, offset):
+            if timestamp > until + slack:
+                break
+            # 文本和json格式的时间只精确到秒
+            if levelno >= level and timestamp + 1 > since and timestamp <= until:
+                yield timestamp, levelno, text
+
+
+def query(filenames: Union[str, Iterable[str]], since: Union[str, float] = None, until: Union[str, float] = None,
+          level: Union[str, int] = logging.NOTSET, slack: float = INDEX_SLACK) -> Iterator[str]:
+    """
+    查询日志文件及其轮转后的备份文件中时间范围内的日志, 多个日志文件(比如访问日志和错误日志)按时间合并输出
+    Args:
+        filenames: 当前日志文件, 比如test.log
+        since: 开始时间, 时间戳, ISO格式的时间或者15m这样的相对时间, 为None时不限制
+        until: 结束时间, 为None时不限制
+        level: 最低级别, 比如WARNING
+        slack: 日志时间乱序的容忍秒数, 比如async_*的日志写入时的延迟
+    Returns:
+        日志文本, 异常日志包含多行
+    """
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    since = float("-inf") if since is None else parse_time(since)
+    until = float("inf") if until is None else parse_time(until)
+    level = logging._checkLevel(level.upper() if isinstance(level, str) else level)
+    streams = [_query_file(filename, since, until, level, slack) for filename in filenames]
+    for _, _, text in heapq.merge(*streams, key=lambda entry: entry[0]):
+        yield text
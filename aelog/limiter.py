@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午5:10
+"""
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .consts import DEDUP_SIZE, DEDUP_WINDOW, LIMITER_SITES, RATE_UNITS, SUPPRESS_SUMMARY_INTERVAL
+
+__all__ = ("CallSiteLimiter", "Deduplicator", "parse_rate")
+
+summary_logger = logging.getLogger("aelog")
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """
+    解析限流配置, 比如100/s, 1000/m, 10/h
+    Args:
+        rate: 限流配置
+    Returns:
+        (每个周期允许的数量, 周期秒数)
+    """
+    try:
+        count, unit = rate.replace(" ", "").split("/")
+        count, period = int(count), RATE_UNITS[unit.lower()]
+    except (AttributeError, KeyError, ValueError):
+        raise ValueError(f"参数rate_limit格式必须为数量/周期, 周期为{tuple(RATE_UNITS)}中的一个, 比如100/s")
+    if count <= 0:
+        raise ValueError("参数rate_limit的数量必须大于0")
+    return count, period
+
+
+class CallSiteLimiter(object):
+    """
+    按调用位置(文件+行号)限流和采样, 在生成日志记录和格式化消息之前检查, 被丢弃的调用开销很小.
+
+    被限流和采样丢弃的日志数量在间隔时间之后的下一次调用时汇总输出一条警告日志. 计数没有加锁, 多线程下是近似值.
+    """
+
+    def __init__(self, rate_limit: Optional[str] = None, sample: Optional[Dict] = None,
+                 summary_interval: float = SUPPRESS_SUMMARY_INTERVAL):
+        """
+        按调用位置限流和采样
+        Args:
+            rate_limit: 每个调用位置的限流配置, 比如100/s, 为None时不限流
+            sample: 各级别的采样比例, 比如{"DEBUG": 0.01}, 没有配置的级别全部输出
+            summary_interval: 汇总输出丢弃数量的间隔秒数
+        Returns:
+
+        """
+        self.rate, self.period = parse_rate(rate_limit) if rate_limit else (0, 0.0)
+        self.sample: Dict[int, float] = {}
+        for level_name, ratio in (sample or {}).items():
+            level = logging.getLevelName(level_name.upper()) if isinstance(level_name, str) else level_name
+            if not isinstance(level, int):
+                raise ValueError(f"参数sample的级别{level_name}不存在")
+            if not 0 <= ratio <= 1:
+                raise ValueError("参数sample的采样比例必须在0到1之间")
+            self.sample[level] = ratio
+        self.summary_interval = summary_interval
+        # 调用位置到[当前周期的开始时间, 当前周期已输出的数量]
+        self._windows: Dict[Tuple[str, int], list] = {}
+        # 调用位置到上次汇总之后丢弃的数量
+        self._suppressed: Dict[Tuple[str, int], int] = {}
+        self._summary_start = time.monotonic()
+        self._summary_at = self._summary_start + summary_interval
+        self._summary_lock = threading.Lock()
+
+    def allow(self, level: int, caller_frame) -> bool:
+        """
+        检查调用位置的日志是否可以输出
+        Args:
+            level: log level
+            caller_frame: 调用方的frame
+        Returns:
+
+        """
+        now = time.monotonic()
+        if now >= self._summary_at:
+            self.summary(now)
+        site = (caller_frame.f_code.co_filename, caller_frame.f_lineno)
+        ratio = self.sample.get(level)
+        if ratio is not None and random.random() >= ratio:
+            self._suppressed[site] = self._suppressed.get(site, 0) + 1
+            return False
+        if not self.rate:
+            return True
+
+        window = self._windows.get(site)
+        if window is None:
+            if len(self._windows) >= LIMITER_SITES:
+                self._windows.clear()
+            self._windows[site] = [now, 1]
+            return True
+        if now - window[0] >= self.period:
+            window[0], window[1] = now, 1
+            return True
+        if window[1] < self.rate:
+            window[1] += 1
+            return True
+        self._suppressed[site] = self._suppressed.get(site, 0) + 1
+        return False
+
+    def summary(self, now: float = None):
+        """
+        输出上次汇总之后被限流和采样丢弃的日志数量
+        Args:
+            now: 当前的monotonic时间
+        Returns:
+
+        """
+        now = time.monotonic() if now is None else now
+        with self._summary_lock:
+            if now < self._summary_at:
+                return
+            start, self._summary_start, self._summary_at = self._summary_start, now, now + self.summary_interval
+            suppressed, self._suppressed = self._suppressed, {}
+        if suppressed:
+            (filename, lineno), top = max(suppressed.items(), key=lambda item: item[1])
+            summary_logger.warning("suppressed %d messages from %d call sites in the last %.0fs, top %s:%d (%d)",
+                                   sum(suppressed.values()), len(suppressed), now - start, filename, lineno, top)
+
+
+class Deduplicator(object):
+    """
+    合并时间窗口内重复的日志, 日志指纹为(logger, 级别, 调用位置, 消息模板或者异常类型).
+
+    窗口内重复的日志在生成记录之前丢弃, 不会格式化消息和异常, 窗口结束后输出一条repeated N times的日志.
+    """
+
+    def __init__(self, levels: Union[bool, Iterable] = True, window: float = DEDUP_WINDOW, size: int = DEDUP_SIZE):
+        """
+        合并重复的日志
+        Args:
+            levels: 需要合并的级别, 比如["WARNING", "ERROR"], 为True时合并所有级别
+            window: 合并的时间窗口秒数
+            size: 记录的日志指纹数量, 超过时输出并淘汰最早的指纹
+        Returns:
+
+        """
+        self.levels: Optional[set] = None
+        if levels is not True:
+            self.levels = set()
+            for level_name in levels:
+                level = logging.getLevelName(level_name.upper()) if isinstance(level_name, str) else level_name
+                if not isinstance(level, int):
+                    raise ValueError(f"参数dedup的级别{level_name}不存在")
+                self.levels.add(level)
+        self.window = window
+        self.size = size
+        # 日志指纹到[窗口开始时间, 重复次数, logger, 文件名, 行号, 函数名, 消息模板]
+        self._entries: OrderedDict = OrderedDict()
+        self._sweep_at = time.monotonic() + window
+        self._lock = threading.Lock()
+
+    def allow(self, logger: logging.Logger, level: int, caller_frame, msg) -> bool:
+        """
+        检查日志是否是窗口内的重复日志
+        Args:
+            logger: 输出日志的logger
+            level: log level
+            caller_frame: 调用方的frame
+            msg: 消息内容, 异常时为异常对象
+        Returns:
+
+        """
+        now = time.monotonic()
+        if now >= self._sweep_at:
+            self.sweep(now)
+        if self.levels is not None and level not in self.levels:
+            return True
+        code = caller_frame.f_code
+        template = msg if isinstance(msg, str) else type(msg)
+        key = (logger.name, level, code.co_filename, caller_frame.f_lineno, template)
+        expired: List = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                allowed = False
+            else:
+                if entry is not None:
+                    expired.append((level, self._entries.pop(key)))
+                elif len(self._entries) >= self.size:
+                    oldest_key, oldest = self._entries.popitem(last=False)
+                    expired.append((oldest_key[1], oldest))
+                self._entries[key] = [now, 0, logger, code.co_filename, caller_frame.f_lineno, code.co_name,
+                                      template]
+                allowed = True
+        for expired_level, expired_entry in expired:
+            self._emit(expired_level, expired_entry, now)
+        return allowed
+
+    def sweep(self, now: float = None, force: bool = False):
+        """
+        输出并淘汰窗口已经结束的日志指纹
+        Args:
+            now: 当前的monotonic时间
+            force: 输出并淘汰所有的日志指纹, 比如重新初始化时
+        Returns:
+
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._sweep_at = now + self.window
+            expired = [key for key, entry in self._entries.items() if force or now - entry[0] >= self.window]
+            expired = [(key[1], self._entries.pop(key)) for key in expired]
+        for level, entry in expired:
+            self._emit(level, entry, now)
+
+    @staticmethod
+    def _emit(level: int, entry: List, now: float):
+        """
+        输出窗口内重复的次数
+        Args:
+            level: log level
+            entry: 日志指纹的记录
+            now: 当前的monotonic时间
+        Returns:
+
+        """
+        start, count, logger, filename, lineno, func, template = entry
+        if count:
+            template = template if isinstance(template, str) else template.__name__
+            logger.handle(logger.makeRecord(logger.name, level, filename, lineno,
+                                            "%s repeated %d times in %.1fs", (template, count, now - start),
+                                            None, func))
@@ -11,7 +11,9 @@ import sys
 from logging import _nameToLevel
 from typing import Dict
 
-from .consts import BACKUP_COUNT, MAX_BYTES
+from .consts import (BACKUP_COUNT, COMPRESS_SUFFIXES, FILE_DATE_FORMAT, FILE_LOG_FORMAT, FLUSH_INTERVAL, FORMATS,
+                     FORMAT_BINARY, FORMAT_JSON, FORMAT_TEXT, MAX_BYTES, QUEUE_POLICY_BLOCK, QUEUE_SIZE, ROTATE_WHENS,
+                     SHIP_FORMAT_NDJSON, SHIP_FORMATS)
 
 __all__ = ["aelog_config", "aelog_default_config", "sanic_log_config"]
 
@@ -31,6 +33,100 @@ def verify_loglevel(loglevel: str) -> str:
     return loglevel
 
 
+def verify_format(log_format: str) -> str:
+    """
+    校验日志文件的格式是否正确
+    Args:
+        log_format: 日志文件的格式
+    Returns:
+
+    """
+    log_format = log_format.lower()
+    if log_format not in FORMATS:
+        raise ValueError(f"参数log_format必须为{FORMATS}中的一个")
+    return log_format
+
+
+def file_handler_config(filename: str, formatter: str, *, level: str = None, max_bytes: int = MAX_BYTES,
+                        backup_count: int = BACKUP_COUNT, buffer_bytes: int = 0,
+                        flush_interval: float = FLUSH_INTERVAL, multiprocess: bool = False, rotate_when: str = None,
+                        compress: str = None, mmap: bool = False, binary: bool = False,
+                        index_bytes: int = 0) -> Dict:
+    """
+    日志文件handler的配置
+    Args:
+        filename: log file
+        formatter: formatter name
+        level: handler level
+        max_bytes: log file max bytes
+        backup_count: backup count
+        buffer_bytes: 缓冲区大小, 大于0时使用带缓冲的handler
+        flush_interval: 缓冲区定时写入的间隔秒数
+        multiprocess: 多个进程写同一个日志文件, 写入和轮转时使用文件锁
+        rotate_when: 按时间轮转的周期, hourly, daily或midnight, 为None时按大小轮转
+        compress: 备份文件在后台线程中的压缩方式, gzip或zstd, 为None时不压缩
+        mmap: 预先分配日志文件并通过mmap写入, 写满max_bytes时轮转
+        binary: 使用二进制模板格式写入, 不使用formatter
+        index_bytes: 大于0时每写入index_bytes字节在时间索引文件中记录一次时间和偏移量, 用于aelog query
+    Returns:
+
+    """
+    if compress is not None and compress not in COMPRESS_SUFFIXES:
+        raise ValueError(f"参数compress必须为{tuple(COMPRESS_SUFFIXES)}中的一个")
+    if binary and (mmap or multiprocess or buffer_bytes > 0 or rotate_when is not None):
+        raise ValueError("二进制格式不支持和mmap, multiprocess, buffer_bytes, rotate_when同时使用")
+    if index_bytes > 0 and (mmap or multiprocess or buffer_bytes > 0 or rotate_when is not None):
+        raise ValueError("时间索引不支持和mmap, multiprocess, buffer_bytes, rotate_when同时使用")
+    if mmap and (multiprocess or buffer_bytes > 0 or rotate_when is not None):
+        raise ValueError("mmap不支持和multiprocess, buffer_bytes, rotate_when同时使用")
+    if rotate_when is not None:
+        if rotate_when not in ROTATE_WHENS:
+            raise ValueError(f"参数rotate_when必须为{tuple(ROTATE_WHENS)}中的一个")
+        if multiprocess or buffer_bytes > 0:
+            raise ValueError("按时间轮转不支持和multiprocess, buffer_bytes同时使用")
+        handler_config = {
+            "class": "aelog.handlers.CompressTimedRotatingFileHandler",
+            "formatter": formatter,
+            "filename": filename,
+            "when": ROTATE_WHENS[rotate_when],
+            "backupCount": backup_count,
+            "encoding": "utf8",
+            "compress": compress,
+        }
+        if level is not None:
+            handler_config["level"] = level
+        return handler_config
+
+    handler_config = {
+        "class": "logging.handlers.RotatingFileHandler",
+        "formatter": formatter,
+        "filename": filename,
+        "maxBytes": max_bytes,
+        "backupCount": backup_count,
+        "encoding": "utf8"
+    }
+    if level is not None:
+        handler_config["level"] = level
+    if binary:
+        handler_config.update({"class": "aelog.binary.BinaryRotatingFileHandler", "compress": compress,
+                               "index_bytes": index_bytes})
+        del handler_config["encoding"]
+    elif index_bytes > 0:
+        handler_config.update({"class": "aelog.index.IndexedRotatingFileHandler", "compress": compress,
+                               "index_bytes": index_bytes})
+    elif mmap:
+        handler_config.update({"class": "aelog.handlers.MmapRotatingFileHandler", "compress": compress})
+    elif multiprocess:
+        handler_config.update({"class": "aelog.handlers.MultiprocessRotatingFileHandler", "buffer_bytes": buffer_bytes,
+                               "flush_interval": flush_interval if buffer_bytes > 0 else 0, "compress": compress})
+    elif buffer_bytes > 0:
+        handler_config.update({"class": "aelog.handlers.BufferedRotatingFileHandler", "buffer_bytes": buffer_bytes,
+                               "flush_interval": flush_interval, "compress": compress})
+    elif compress is not None:
+        handler_config.update({"class": "aelog.handlers.CompressRotatingFileHandler", "compress": compress})
+    return handler_config
+
+
 def aelog_default_config(loglevel: str = "DEBUG") -> Dict:
     """
     default logging config
@@ -46,9 +142,9 @@ def aelog_default_config(loglevel: str = "DEBUG") -> Dict:
 
         "formatters": {
             "aelog_default": {
-                "format": '%(asctime)s %(log_color)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(message)s',
+                "format": '%(asctime)s %(log_color)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(context_text)s%(message)s',
                 "datefmt": "[%Y-%m-%d %H:%M:%S %z]",
-                "class": "colorlog.ColoredFormatter",
+                "class": "aelog.colored.ColoredFormatter",
                 "reset": True,
                 "log_colors": {
                     'DEBUG': 'cyan',
@@ -60,10 +156,16 @@ def aelog_default_config(loglevel: str = "DEBUG") -> Dict:
                 },
             }
         },
+        "filters": {
+            "aelog_context": {
+                "()": "aelog.context.ContextFilter",
+            },
+        },
         "handlers": {
             "aelog_console": {
                 "class": "logging.StreamHandler",
                 "formatter": "aelog_default",
+                "filters": ["aelog_context"],
                 "stream": sys.stdout,
             }
         },
@@ -77,7 +179,13 @@ def aelog_default_config(loglevel: str = "DEBUG") -> Dict:
 
 
 def aelog_config(access_file: str, *, error_file: str = None, console: bool = True, loglevel: str = "DEBUG",
-                 max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT) -> Dict:
+                 max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT, queue: bool = False,
+                 queue_size: int = QUEUE_SIZE, queue_policy: str = QUEUE_POLICY_BLOCK, buffer_bytes: int = 0,
+                 flush_interval: float = FLUSH_INTERVAL, log_format: str = FORMAT_TEXT,
+                 multiprocess: bool = False, rotate_when: str = None, compress: str = None,
+                 ring_size: int = 0, mmap: bool = False, ship_address: str = None,
+                 ship_format: str = SHIP_FORMAT_NDJSON, ship_spill_file: str = None,
+                 index_bytes: int = 0) -> Dict:
     """
     global logging config
     Args:
@@ -87,10 +195,32 @@ def aelog_config(access_file: str, *, error_file: str = None, console: bool = Tr
         backup_count: backup count
         error_file: error log full file
         loglevel: log level, default debug
+        queue: 日志先放入内存队列, 由后台线程写入console和文件
+        queue_size: 队列的最大长度
+        queue_policy: 队列满时的处理策略, block, drop_oldest或drop_newest
+        buffer_bytes: 日志文件缓冲区大小, 大于0时日志先放入缓冲区再批量写入文件
+        flush_interval: 缓冲区定时写入的间隔秒数
+        log_format: 日志文件的格式, text, json或binary
+        multiprocess: 多个进程写同一个日志文件, 写入和轮转时使用文件锁
+        rotate_when: 按时间轮转的周期, hourly, daily或midnight, 为None时按大小轮转
+        compress: 备份文件在后台线程中的压缩方式, gzip或zstd, 为None时不压缩
+        mmap: 预先分配日志文件并通过mmap写入, 写满max_bytes时轮转
+        ring_size: 大于0时DEBUG和INFO日志只保存在每个线程或task的环形缓冲区中, 出现ERROR时把最近的日志写入错误日志文件,
+            访问日志文件只记录WARNING以上的日志
+        ship_address: 日志收集端的地址, host:port或者unix:/path/to/socket, 日志由后台线程批量发送
+        ship_format: 发送到收集端的格式, ndjson或syslog
+        ship_spill_file: 收集端不可用时保存日志的本地文件, 默认为访问日志文件名加.spill
+        index_bytes: 大于0时为日志文件维护时间索引, 每写入index_bytes字节记录一次, 用于aelog query
     Returns:
 
     """
     loglevel = verify_loglevel(loglevel)
+    log_format = verify_format(log_format)
+    file_formatter = "aelog_json" if log_format == FORMAT_JSON else "aelog_file"
+    file_options = {"max_bytes": max_bytes, "backup_count": backup_count, "buffer_bytes": buffer_bytes,
+                    "flush_interval": flush_interval, "multiprocess": multiprocess, "rotate_when": rotate_when,
+                    "compress": compress, "mmap": mmap, "binary": log_format == FORMAT_BINARY,
+                    "index_bytes": index_bytes}
     if console:
         handlers = ["aelog_console", "aelog_access_file", "aelog_error_file"]
     else:
@@ -108,9 +238,9 @@ def aelog_config(access_file: str, *, error_file: str = None, console: bool = Tr
 
         "formatters": {
             "aelog_default": {
-                "format": '%(asctime)s %(log_color)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(message)s',
+                "format": '%(asctime)s %(log_color)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(context_text)s%(message)s',
                 "datefmt": "[%Y-%m-%d %H:%M:%S %z]",
-                "class": "colorlog.ColoredFormatter",
+                "class": "aelog.colored.ColoredFormatter",
                 "reset": True,
                 "log_colors": {
                     'DEBUG': 'cyan',
@@ -120,6 +250,19 @@ def aelog_config(access_file: str, *, error_file: str = None, console: bool = Tr
                     'CRITICAL': 'bold_red,bg_white',
                 },
             },
+            "aelog_file": {
+                "format": FILE_LOG_FORMAT,
+                "datefmt": FILE_DATE_FORMAT,
+                "class": "aelog.formatters.PlainFormatter",
+            },
+            "aelog_json": {
+                "class": "aelog.formatters.JsonFormatter",
+            },
+        },
+        "filters": {
+            "aelog_context": {
+                "()": "aelog.context.ContextFilter",
+            },
         },
         "handlers": {
             "aelog_console": {
@@ -127,23 +270,9 @@ def aelog_config(access_file: str, *, error_file: str = None, console: bool = Tr
                 "formatter": "aelog_default",
                 "stream": sys.stdout,
             },
-            "aelog_access_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "formatter": "aelog_default",
-                "filename": access_file,
-                "maxBytes": max_bytes,
-                "backupCount": backup_count,
-                "encoding": "utf8"
-            },
-            "aelog_error_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": "ERROR",
-                "formatter": "aelog_default",
-                "filename": error_file,
-                "maxBytes": max_bytes,
-                "backupCount": backup_count,
-                "encoding": "utf8"
-            },
+            "aelog_access_file": file_handler_config(access_file, file_formatter,
+                                                     level="WARNING" if ring_size > 0 else None, **file_options),
+            "aelog_error_file": file_handler_config(error_file, file_formatter, level="ERROR", **file_options),
         },
         "loggers": {
             "": {
@@ -152,11 +281,47 @@ def aelog_config(access_file: str, *, error_file: str = None, console: bool = Tr
             }
         }
     }
+    if ship_address is not None:
+        if ship_format not in SHIP_FORMATS:
+            raise ValueError(f"ship_format必须为{SHIP_FORMATS}中的一个")
+        log_config["handlers"]["aelog_ship"] = {
+            "()": "aelog.shipping.ShippingHandler",
+            "formatter": "aelog_json" if ship_format == SHIP_FORMAT_NDJSON else "aelog_file",
+            "address": ship_address,
+            "ship_format": ship_format,
+            "spill_file": ship_spill_file or f"{access_file}.spill",
+        }
+        handlers.append("aelog_ship")
+    if ring_size > 0:
+        log_config["handlers"]["aelog_ring"] = {
+            "()": "aelog.handlers.RingBufferHandler",
+            "target": "aelog_error_file",
+            "capacity": ring_size,
+        }
+        # 缓冲的日志要在ERROR日志之前写入错误日志文件
+        handlers.insert(handlers.index("aelog_error_file"), "aelog_ring")
+    if queue:
+        log_config["handlers"]["aelog_queue"] = {
+            "()": "aelog.handlers.AelogQueueHandler",
+            "handlers": handlers,
+            "maxsize": queue_size,
+            "policy": queue_policy,
+        }
+        log_config["loggers"][""]["handlers"] = ["aelog_queue"]
+    if not console:
+        # 不输出到终端时不创建终端的handler, 也就不需要导入colorlog
+        del log_config["handlers"]["aelog_console"], log_config["formatters"]["aelog_default"]
+    # 日志记录的上下文字段只渲染一次, 所有handler共用
+    for handler_config in log_config["handlers"].values():
+        handler_config["filters"] = ["aelog_context"]
     return log_config
 
 
 def sanic_log_config(access_file: str, *, error_file: str = None, console: bool = True, loglevel: str = "DEBUG",
-                     max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT) -> Dict:
+                     max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT, buffer_bytes: int = 0,
+                     flush_interval: float = FLUSH_INTERVAL, log_format: str = FORMAT_TEXT,
+                     multiprocess: bool = False, rotate_when: str = None, compress: str = None,
+                     mmap: bool = False) -> Dict:
     """
     global logging config
     Args:
@@ -166,10 +331,24 @@ def sanic_log_config(access_file: str, *, error_file: str = None, console: bool
         backup_count: backup count
         error_file: error log full file
         loglevel: log level, default debug
+        buffer_bytes: 日志文件缓冲区大小, 大于0时日志先放入缓冲区再批量写入文件
+        flush_interval: 缓冲区定时写入的间隔秒数
+        log_format: 日志文件的格式, text或json
+        multiprocess: 多个进程写同一个日志文件, 写入和轮转时使用文件锁
+        rotate_when: 按时间轮转的周期, hourly, daily或midnight, 为None时按大小轮转
+        compress: 备份文件在后台线程中的压缩方式, gzip或zstd, 为None时不压缩
+        mmap: 预先分配日志文件并通过mmap写入, 写满max_bytes时轮转
     Returns:
 
     """
     loglevel = verify_loglevel(loglevel)
+    log_format = verify_format(log_format)
+    if log_format == FORMAT_BINARY:
+        raise ValueError("sanic日志不支持二进制格式")
+    json_format = log_format == FORMAT_JSON
+    file_options = {"max_bytes": max_bytes, "backup_count": backup_count, "buffer_bytes": buffer_bytes,
+                    "flush_interval": flush_interval, "multiprocess": multiprocess, "rotate_when": rotate_when,
+                    "compress": compress, "mmap": mmap}
     if access_file.endswith(".log"):
         access_file = access_file
     else:
@@ -189,13 +368,16 @@ def sanic_log_config(access_file: str, *, error_file: str = None, console: bool
             "generic": {
                 "format": "%(asctime)s [%(process)d] [%(levelname)s] %(message)s",
                 "datefmt": "[%Y-%m-%d %H:%M:%S %z]",
-                "class": "logging.Formatter",
+                "class": "aelog.formatters.PlainFormatter",
             },
             "access": {
                 "format": "%(asctime)s - (%(name)s)[%(levelname)s][%(host)s]: "
                           + "%(request)s %(message)s %(status)d %(byte)d",
                 "datefmt": "[%Y-%m-%d %H:%M:%S %z]",
-                "class": "logging.Formatter",
+                "class": "aelog.formatters.PlainFormatter",
+            },
+            "json": {
+                "class": "aelog.formatters.JsonFormatter",
             },
         },
         "handlers": {
@@ -209,29 +391,15 @@ def sanic_log_config(access_file: str, *, error_file: str = None, console: bool
                 "formatter": "access",
                 "stream": sys.stdout,
             },
-            "access_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": "INFO",
-                "formatter": "access",
-                "filename": access_file,
-                "maxBytes": max_bytes,
-                "backupCount": backup_count,
-                "encoding": "utf8"
-            },
+            "access_file": file_handler_config(access_file, "json" if json_format else "access", level="INFO",
+                                               **file_options),
             "error_console": {
                 "class": "logging.StreamHandler",
                 "formatter": "generic",
                 "stream": sys.stdout,
             },
-            "error_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": "ERROR",
-                "formatter": "generic",
-                "filename": error_file,
-                "maxBytes": max_bytes,
-                "backupCount": backup_count,
-                "encoding": "utf8"
-            },
+            "error_file": file_handler_config(error_file, "json" if json_format else "generic", level="ERROR",
+                                              **file_options),
         },
         "loggers": {
             "sanic.root": {
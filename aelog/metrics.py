@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午9:10
+"""
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from .consts import DURATION_BUCKETS
+
+__all__ = ("stats", "prometheus_text", "enable_stats", "disable_stats", "reset_stats")
+
+# 是否开启统计, 关闭时日志调用只多一次属性判断
+enabled = False
+
+# 每个线程一个计数字典, 写入时不加锁, 读取时汇总所有线程的计数
+_local = threading.local()
+_thread_counters: List[Tuple[threading.Thread, Dict]] = []
+# 已经退出的线程的计数, 新线程注册时合并, 避免线程不断创建时计数字典一直增加
+_retired_counters: Dict = {}
+_register_lock = threading.Lock()
+
+
+def _counters() -> Dict:
+    """
+    获取当前线程的计数字典
+    Args:
+
+    Returns:
+
+    """
+    try:
+        return _local.counters
+    except AttributeError:
+        counters = _local.counters = {}
+        with _register_lock:
+            for thread, thread_counters in _thread_counters[:]:
+                if not thread.is_alive():
+                    _thread_counters.remove((thread, thread_counters))
+                    _merge(_retired_counters, thread_counters)
+            _thread_counters.append((threading.current_thread(), counters))
+        return counters
+
+
+def _merge(total: Dict, counters: Dict):
+    """
+    把计数合并到汇总的计数中
+    Args:
+        total: 汇总的计数
+        counters: 线程的计数
+    Returns:
+
+    """
+    for key, value in counters.copy().items():
+        total[key] = total.get(key, 0) + value
+
+
+def incr(key: Tuple, value: float = 1):
+    """
+    增加当前线程的计数
+    Args:
+        key: 计数的名称和标签
+        value: 增加的值
+    Returns:
+
+    """
+    counters = _counters()
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name: str, label: str, seconds: float):
+    """
+    记录一次耗时到直方图
+    Args:
+        name: 直方图名称
+        label: 标签, 比如handler名称
+        seconds: 耗时秒数
+    Returns:
+
+    """
+    counters = _counters()
+    for key, value in (((name, label, "sum"), seconds), ((name, label, "count"), 1),
+                       ((name, label, bisect.bisect_left(DURATION_BUCKETS, seconds)), 1)):
+        counters[key] = counters.get(key, 0) + value
+
+
+def _collect() -> Dict:
+    """
+    汇总所有线程的计数
+    Args:
+
+    Returns:
+
+    """
+    with _register_lock:
+        total = _retired_counters.copy()
+        thread_counters = _thread_counters[:]
+    for _, counters in thread_counters:
+        _merge(total, counters)
+    return total
+
+
+def _histogram(total: Dict, name: str, label: str) -> Dict:
+    """
+    从计数中生成累计的直方图
+    Args:
+        total: 汇总后的计数
+        name: 直方图名称
+        label: 标签
+    Returns:
+
+    """
+    buckets, cumulative = {}, 0
+    for index, bound in enumerate(DURATION_BUCKETS + (float("inf"),)):
+        cumulative += total.get((name, label, index), 0)
+        buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+    return {"count": total.get((name, label, "count"), 0), "sum": total.get((name, label, "sum"), 0.0),
+            "buckets": buckets}
+
+
+def _handler_name(handler: logging.Handler) -> str:
+    """
+    handler的统计名称, dictConfig中配置的handler使用配置的名称
+    Args:
+        handler: handler
+    Returns:
+
+    """
+    return handler.get_name() or type(handler).__name__
+
+
+def _iter_handlers() -> List[logging.Handler]:
+    """
+    root logger的handler以及队列handler后台线程中的handler
+    Args:
+
+    Returns:
+
+    """
+    handlers = []
+    for handler in logging.root.handlers:
+        handlers.append(handler)
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            handlers.extend(listener.handlers)
+        target = getattr(handler, "target", None)
+        if isinstance(target, logging.Handler) and target not in logging.root.handlers:
+            handlers.append(target)
+    return handlers
+
+
+def _instrument(handler: logging.Handler):
+    """
+    在handler实例上包装format, emit和doRollover, 统计输出的字符数, 格式化, 输出和轮转的耗时
+    Args:
+        handler: handler
+    Returns:
+
+    """
+    if "emit" in handler.__dict__:
+        return
+    name = _handler_name(handler)
+    perf_counter = time.perf_counter
+    format_, emit_ = handler.format, handler.emit
+
+    def format(record: logging.LogRecord) -> str:
+        start = perf_counter()
+        text = format_(record)
+        counters = _counters()
+        for key, value in ((("handler_format_seconds", name), perf_counter() - start),
+                           (("handler_bytes", name), len(text) + 1)):
+            counters[key] = counters.get(key, 0) + value
+        return text
+
+    def emit(record: logging.LogRecord):
+        start = perf_counter()
+        emit_(record)
+        observe("handler_emit_seconds", name, perf_counter() - start)
+
+    handler.format, handler.emit = format, emit
+    do_rollover = getattr(handler, "doRollover", None)
+    if do_rollover is not None:
+        def doRollover():
+            rollover_start = perf_counter()
+            do_rollover()
+            observe("handler_rotation_seconds", name, perf_counter() - rollover_start)
+
+        handler.doRollover = doRollover
+
+
+def _uninstrument(handler: logging.Handler):
+    """
+    删除handler实例上的包装
+    Args:
+        handler: handler
+    Returns:
+
+    """
+    for attr in ("format", "emit", "doRollover"):
+        handler.__dict__.pop(attr, None)
+
+
+def enable_stats():
+    """
+    开启统计, 包装当前配置的所有handler, init_app(aelog_stats=True)重新配置之后会自动调用
+    Args:
+
+    Returns:
+
+    """
+    global enabled
+    for handler in _iter_handlers():
+        _instrument(handler)
+    enabled = True
+
+
+def disable_stats():
+    """
+    关闭统计, 已有的计数保留
+    Args:
+
+    Returns:
+
+    """
+    global enabled
+    enabled = False
+    for handler in _iter_handlers():
+        _uninstrument(handler)
+
+
+def reset_stats():
+    """
+    清空所有的计数
+    Args:
+
+    Returns:
+
+    """
+    with _register_lock:
+        _retired_counters.clear()
+        for _, counters in _thread_counters:
+            counters.clear()
+
+
+def stats() -> Dict:
+    """
+    获取日志管道的统计, 包括各级别和logger的日志数量, 各handler输出的字符数, 格式化和输出的耗时, 轮转的次数和耗时,
+    队列的长度和丢弃数量, 以及async_*日志在后台线程队列中的等待时间
+    Args:
+
+    Returns:
+
+    """
+    # noinspection PyProtectedMember
+    from .aelog import _writer
+
+    total = _collect()
+    records: Dict = {}
+    for key, value in total.items():
+        if key[0] == "records":
+            level_records = records.setdefault(logging.getLevelName(key[1]), {})
+            level_records[key[2]] = level_records.get(key[2], 0) + value
+
+    handler_names = {key[1] for key in total if key[0].startswith("handler_")}
+    handlers = {}
+    for name in sorted(handler_names):
+        emit = _histogram(total, "handler_emit_seconds", name)
+        format_seconds = total.get(("handler_format_seconds", name), 0.0)
+        handlers[name] = {
+            "records": emit["count"],
+            "bytes": total.get(("handler_bytes", name), 0),
+            "format_seconds": format_seconds,
+            "write_seconds": max(emit["sum"] - format_seconds, 0.0),
+            "emit_seconds": emit,
+            "rotation_seconds": _histogram(total, "handler_rotation_seconds", name),
+        }
+
+    queues = {}
+    for handler in _iter_handlers():
+        if hasattr(handler, "dropped"):
+            queues[_handler_name(handler)] = {"depth": handler.queue.qsize(), "dropped": handler.dropped}
+
+    return {
+        "enabled": enabled,
+        "records": records,
+        "handlers": handlers,
+        "queues": queues,
+        "writer": {"depth": _writer.qsize(), "wait_seconds": _histogram(total, "writer_wait_seconds", "")},
+    }
+
+
+def _labels(**labels) -> str:
+    """
+    生成prometheus的标签
+    Args:
+        labels: 标签
+    Returns:
+
+    """
+    text = ",".join('{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                    for key, value in labels.items())
+    return f"{{{text}}}" if text else ""
+
+
+def _prometheus_histogram(lines: List[str], name: str, histogram: Dict, **labels):
+    """
+    输出prometheus格式的直方图
+    Args:
+        lines: 输出的行
+        name: 指标名称
+        histogram: 直方图
+        labels: 标签
+    Returns:
+
+    """
+    for bound, count in histogram["buckets"].items():
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram['sum']}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram['count']}")
+
+
+def prometheus_text() -> str:
+    """
+    按prometheus的文本格式输出统计, 可以直接作为/metrics接口的响应
+    Args:
+
+    Returns:
+
+    """
+    data = stats()
+    lines = ["# TYPE aelog_records_total counter"]
+    for level, loggers in data["records"].items():
+        for logger, count in loggers.items():
+            lines.append(f"aelog_records_total{_labels(level=level, logger=logger)} {count}")
+    for name, kind in (("bytes", "counter"), ("format_seconds", "counter"), ("write_seconds", "counter")):
+        lines.append(f"# TYPE aelog_handler_{name}_total {kind}")
+        for handler, handler_stats in data["handlers"].items():
+            lines.append(f"aelog_handler_{name}_total{_labels(handler=handler)} {handler_stats[name]}")
+    for name in ("emit_seconds", "rotation_seconds"):
+        lines.append(f"# TYPE aelog_handler_{name} histogram")
+        for handler, handler_stats in data["handlers"].items():
+            _prometheus_histogram(lines, f"aelog_handler_{name}", handler_stats[name], handler=handler)
+    lines.append("# TYPE aelog_queue_depth gauge")
+    lines.extend(f"aelog_queue_depth{_labels(handler=handler)} {queue['depth']}"
+                 for handler, queue in data["queues"].items())
+    lines.append("# TYPE aelog_queue_dropped_total counter")
+    lines.extend(f"aelog_queue_dropped_total{_labels(handler=handler)} {queue['dropped']}"
+                 for handler, queue in data["queues"].items())
+    lines.append("# TYPE aelog_writer_depth gauge")
+    lines.append(f"aelog_writer_depth {data['writer']['depth']}")
+    lines.append("# TYPE aelog_writer_wait_seconds histogram")
+    _prometheus_histogram(lines, "aelog_writer_wait_seconds", data["writer"]["wait_seconds"])
+    return "\n".join(lines) + "\n"
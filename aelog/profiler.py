@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午10:10
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .consts import PROFILE_INTERVAL, PROFILE_TOP
+
+__all__ = ("CallSiteProfiler",)
+
+
+class CallSiteProfiler(object):
+    """
+    按调用位置统计日志调用的次数, 生成记录和消息的耗时, 消息的字符数以及handler的耗时, 找出开销最大的日志调用.
+
+    统计没有加锁, 多线程下是近似值. 配置了文件时定时把报告写入文件, 进程退出时再写入一次.
+    """
+
+    def __init__(self, filename: Optional[str] = None, interval: float = PROFILE_INTERVAL, top: int = PROFILE_TOP):
+        """
+        按调用位置统计日志调用的开销
+        Args:
+            filename: 定时写入报告的文件, 为None时只能通过report获取
+            interval: 写入报告的间隔秒数
+            top: 报告中的调用位置数量
+        Returns:
+
+        """
+        self.filename = filename
+        self.interval = interval
+        self.top = top
+        # (文件名, 行号)到[函数名, 调用次数, 生成记录和消息的秒数, 消息字符数, handler秒数]
+        self.sites: Dict = {}
+        self._stopped = threading.Event()
+        if filename is not None:
+            threading.Thread(target=self._dump_periodically, name="aelog-profile", daemon=True).start()
+            atexit.register(self.close)
+
+    def add(self, caller_frame, build_seconds: float, size: int, handle_seconds: float):
+        """
+        累加一次日志调用的开销
+        Args:
+            caller_frame: 调用方的frame
+            build_seconds: 生成记录和消息的秒数
+            size: 消息的字符数
+            handle_seconds: handler输出的秒数
+        Returns:
+
+        """
+        code = caller_frame.f_code
+        key = (code.co_filename, caller_frame.f_lineno)
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = [code.co_name, 0, 0.0, 0, 0.0]
+        site[1] += 1
+        site[2] += build_seconds
+        site[3] += size
+        site[4] += handle_seconds
+
+    def report(self, top: int = None) -> List[Dict]:
+        """
+        按总耗时从大到小返回开销最大的调用位置
+        Args:
+            top: 调用位置数量, 为None时使用初始化时的数量
+        Returns:
+
+        """
+        sites = [{"file": filename, "lineno": lineno, "func": func, "calls": calls, "build_seconds": build,
+                  "bytes": size, "handle_seconds": handle, "total_seconds": build + handle}
+                 for (filename, lineno), (func, calls, build, size, handle) in list(self.sites.items())]
+        sites.sort(key=lambda site: site["total_seconds"], reverse=True)
+        return sites[:self.top if top is None else top]
+
+    def format_report(self, top: int = None) -> str:
+        """
+        生成文本格式的报告
+        Args:
+            top: 调用位置数量, 为None时使用初始化时的数量
+        Returns:
+
+        """
+        lines = [time.strftime("[%Y-%m-%d %H:%M:%S %z] aelog profile"),
+                 f"{'total(s)':>10} {'build(s)':>10} {'handle(s)':>10} {'calls':>10} {'bytes':>12}  location"]
+        for site in self.report(top):
+            lines.append(f"{site['total_seconds']:>10.4f} {site['build_seconds']:>10.4f} "
+                         f"{site['handle_seconds']:>10.4f} {site['calls']:>10} {site['bytes']:>12}  "
+                         f"{site['file']}:{site['lineno']} {site['func']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """
+        把报告写入文件, 替换上一次的报告
+        Args:
+
+        Returns:
+
+        """
+        if self.filename is not None:
+            # 先写入临时文件再改名, 读取报告时不会读到写了一半的文件
+            tmp_filename = f"{self.filename}.tmp"
+            with open(tmp_filename, "w", encoding="utf8") as fp:
+                fp.write(self.format_report())
+            os.replace(tmp_filename, self.filename)
+
+    def _dump_periodically(self):
+        """
+        定时把报告写入文件
+        Args:
+
+        Returns:
+
+        """
+        while not self._stopped.wait(self.interval):
+            self.dump()
+
+    def close(self):
+        """
+        停止定时写入并写入最后一次报告
+        Args:
+
+        Returns:
+
+        """
+        if not self._stopped.is_set():
+            self._stopped.set()
+            if self.filename is not None:
+                atexit.unregister(self.close)
+            self.dump()
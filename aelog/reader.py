@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午8:30
+
+按顺序读取aelog输出的日志文件及其轮转后的备份文件, 还原为日志记录:
+
+    for record in read_records("test.log", follow=True):
+        print(record.created, record.levelname, record.name, record.funcName, record.lineno, record.getMessage())
+"""
+import contextlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import BinaryIO, Iterator, List, Optional
+
+from .binary import MAGIC, _Decoder
+from .consts import COMPRESS_SUFFIXES, READER_CHUNK_BYTES, READER_INTERVAL
+# noinspection PyProtectedMember
+from .formatters import _RECORD_ATTRS
+from .handlers import open_log_file
+# noinspection PyProtectedMember
+from .index import _TEXT_HEAD, _TextTime, list_segments
+
+__all__ = ("read_records",)
+
+# 文本日志的级别, logger名称, 函数和行号, 和FILE_LOG_FORMAT对应, 之后为上下文字段和消息
+_TEXT_FIELDS = re.compile(r"^\[[^\]]+\] \[(\w+)\] (\S+) \[(\S+) (\d+)\]: ")
+# 判断轮转后的备份文件是否为已经读过的文件时比较的文件开头字节数
+_HEAD_BYTES = 1024
+
+
+def _level(levelname: str) -> int:
+    """
+    级别名称对应的级别
+    Args:
+        levelname: 级别名称
+    Returns:
+
+    """
+    levelno = logging.getLevelName(levelname)
+    return levelno if isinstance(levelno, int) else logging.NOTSET
+
+
+class _LineParser(object):
+    """
+    按行解析文本和json日志, 保存数据块末尾不完整的行
+    """
+
+    binary = False
+
+    def __init__(self):
+        self.rest = b""
+
+    def feed(self, data: bytes) -> List[logging.LogRecord]:
+        """
+        解析新读取的数据
+        Args:
+            data: 数据块
+        Returns:
+            已经完整的日志记录
+        """
+        lines = (self.rest + data).split(b"\n")
+        self.rest = lines.pop()
+        records: List[logging.LogRecord] = []
+        for line in lines:
+            self.line(line, records)
+        return records
+
+    def end(self, final: bool) -> List[logging.LogRecord]:
+        """
+        没有更多数据时输出还没有结束的日志
+        Args:
+            final: 文件已经写完, 末尾不完整的行也作为日志输出
+        Returns:
+
+        """
+        records: List[logging.LogRecord] = []
+        if final and self.rest:
+            self.line(self.rest, records)
+            self.rest = b""
+        return records
+
+    def line(self, line: bytes, records: List[logging.LogRecord]):
+        """
+        解析一行
+        Args:
+            line: 不带换行符的行
+            records: 解析出的日志记录
+        Returns:
+
+        """
+        raise NotImplementedError
+
+
+class _TextParser(_LineParser):
+    """
+    解析文本日志, 开头不是时间和级别的行属于上一条日志, 比如异常的调用栈
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parse_time_text = _TextTime()
+        self.created = 0.0
+        self.entry: Optional[List[bytes]] = None
+
+    def line(self, line: bytes, records: List[logging.LogRecord]):
+        match = _TEXT_HEAD.match(line)
+        if match is None:
+            if self.entry is not None:
+                self.entry.append(line)
+            return
+        self.pending(records)
+        self.created = self.parse_time_text(match.group(1))
+        self.entry = [line]
+
+    def end(self, final: bool) -> List[logging.LogRecord]:
+        records = super().end(final)
+        self.pending(records)
+        return records
+
+    def pending(self, records: List[logging.LogRecord]):
+        """
+        输出正在收集的日志
+        Args:
+            records: 解析出的日志记录
+        Returns:
+
+        """
+        if self.entry is None:
+            return
+        text = b"\n".join(self.entry).decode("utf-8", "replace")
+        self.entry = None
+        match = _TEXT_FIELDS.match(text)
+        if match is None:
+            levelname = _TEXT_HEAD.match(text.encode()).group(2).decode()
+            attrs = {"levelname": levelname, "msg": text}
+        else:
+            levelname, name, func, lineno = match.groups()
+            attrs = {"levelname": levelname, "name": name, "funcName": func, "lineno": int(lineno),
+                     "msg": text[match.end():]}
+        attrs.update(levelno=_level(levelname), created=self.created, msecs=0.0, args=(), context_text="")
+        records.append(logging.makeLogRecord(attrs))
+
+
+class _JsonParser(_LineParser):
+    """
+    解析每行一个json的日志
+    """
+
+    def line(self, line: bytes, records: List[logging.LogRecord]):
+        try:
+            data = json.loads(line)
+            created = datetime.strptime(data.pop("time"), "%Y-%m-%dT%H:%M:%S%z").timestamp()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return
+        levelname = data.pop("level", "NOTSET")
+        attrs = {
+            "name": data.pop("name", ""), "levelname": levelname, "levelno": _level(levelname),
+            "funcName": data.pop("func", ""), "lineno": data.pop("lineno", 0), "msg": data.pop("message", ""),
+            "exc_text": data.pop("exception", None), "stack_info": data.pop("stack", None),
+            "created": created, "msecs": 0.0, "args": (), "context_text": "",
+        }
+        # 上下文字段和extra字段, 和日志记录本身的属性同名时忽略
+        attrs.update((key, value) for key, value in data.items() if key not in _RECORD_ATTRS)
+        records.append(logging.makeLogRecord(attrs))
+
+
+class _BinaryParser(object):
+    """
+    解析二进制格式的日志, 保存数据块末尾不完整的条目
+    """
+
+    binary = True
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.decoder: Optional[_Decoder] = None
+
+    def feed(self, data: bytes) -> List[logging.LogRecord]:
+        buffer = self.buffer
+        buffer += data
+        records: List[logging.LogRecord] = []
+        pos = 0
+        if self.decoder is None:
+            if len(buffer) < len(MAGIC):
+                return records
+            if buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError("不是aelog二进制格式的日志文件")
+            self.decoder, pos = _Decoder(), len(MAGIC)
+        length = len(buffer)
+        while pos < length:
+            # 条目类型之后为条目长度的varint
+            size = shift = 0
+            end = pos + 1
+            while end < length:
+                byte = buffer[end]
+                end += 1
+                size |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            else:
+                break
+            if end + size > length:
+                break
+            record = self.decoder.entry(buffer[pos], bytes(buffer[end:end + size]))
+            if record is not None:
+                records.append(record)
+            pos = end + size
+        del buffer[:pos]
+        return records
+
+    def end(self, final: bool) -> List[logging.LogRecord]:
+        # 末尾不完整的条目被忽略
+        return []
+
+
+def _parser(data: bytes):
+    """
+    根据文件开头识别日志格式
+    Args:
+        data: 文件开头的数据
+    Returns:
+
+    """
+    if data[:1] == MAGIC[:1]:
+        return _BinaryParser()
+    if data[:1] == b"{":
+        return _JsonParser()
+    return _TextParser()
+
+
+def _open_segment(segment: str) -> BinaryIO:
+    """
+    打开日志文件, 备份文件在列出之后被压缩时打开压缩后的文件
+    Args:
+        segment: 日志文件
+    Returns:
+
+    """
+    try:
+        return open_log_file(segment)
+    except FileNotFoundError:
+        for suffix in COMPRESS_SUFFIXES.values():
+            if os.path.exists(f"{segment}{suffix}"):
+                return open_log_file(f"{segment}{suffix}")
+        raise
+
+
+def _read_head(segment: str, size: int) -> bytes:
+    """
+    读取日志文件开头的数据
+    Args:
+        segment: 日志文件
+        size: 字节数
+    Returns:
+
+    """
+    head = b""
+    try:
+        with _open_segment(segment) as fp:
+            while len(head) < size:
+                data = fp.read(size - len(head))
+                if not data:
+                    break
+                head += data
+    except OSError:
+        pass
+    return head
+
+
+def _read_file(fp: BinaryIO) -> Iterator[logging.LogRecord]:
+    """
+    分块读取整个日志文件, mmap日志文件末尾填充的NUL之后没有日志
+    Args:
+        fp: 已经打开的日志文件
+    Returns:
+
+    """
+    parser = None
+    while True:
+        data = fp.read(READER_CHUNK_BYTES)
+        if not data:
+            break
+        if parser is None:
+            parser = _parser(data)
+        nul = -1 if parser.binary else data.find(b"\0")
+        if nul >= 0:
+            data = data[:nul]
+        yield from parser.feed(data)
+        if nul >= 0:
+            break
+    if parser is not None:
+        yield from parser.end(True)
+
+
+class _LiveFile(object):
+    """
+    跟随读取的当前日志文件, 记录读取位置和文件开头的数据, 轮转后用于找到更新的备份文件
+    """
+
+    def __init__(self, filename: str):
+        self.fp = open(filename, "rb")
+        stat = os.fstat(self.fp.fileno())
+        self.ident = (stat.st_dev, stat.st_ino)
+        self.pos = 0
+        self.head = b""
+        self.parser = None
+
+    def read(self) -> Optional[List[logging.LogRecord]]:
+        """
+        读取一块新写入的数据
+        Args:
+
+        Returns:
+            解析出的日志记录, 没有新数据时返回None
+        """
+        if os.fstat(self.fp.fileno()).st_size < self.pos:
+            # 文件被截断, 从头开始读取
+            self.fp.seek(0)
+            self.pos, self.head, self.parser = 0, b"", None
+        data = self.fp.read(READER_CHUNK_BYTES)
+        if not (self.parser.binary if self.parser is not None else data[:1] == MAGIC[:1]):
+            nul = data.find(b"\0")
+            if nul >= 0:
+                # mmap日志文件末尾填充的NUL还没有写入日志, 下次从这里继续读取
+                data = data[:nul]
+                self.fp.seek(self.pos + nul)
+        if not data:
+            return None
+        if self.parser is None:
+            self.parser = _parser(data)
+        self.pos += len(data)
+        if len(self.head) < _HEAD_BYTES:
+            self.head += data[:_HEAD_BYTES - len(self.head)]
+        return self.parser.feed(data)
+
+    def end(self, final: bool) -> List[logging.LogRecord]:
+        """
+        没有新数据时输出还没有结束的日志
+        Args:
+            final: 文件已经轮转, 不会再写入
+        Returns:
+
+        """
+        return self.parser.end(final) if self.parser is not None else []
+
+    def drain(self) -> Iterator[logging.LogRecord]:
+        """
+        文件轮转后读取剩余的日志
+        Args:
+
+        Returns:
+
+        """
+        while True:
+            records = self.read()
+            if records is None:
+                break
+            yield from records
+        yield from self.end(True)
+
+    def rotated(self, filename: str) -> bool:
+        """
+        日志文件名是否已经指向新的文件
+        Args:
+            filename: 日志文件
+        Returns:
+
+        """
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            # 轮转后还没有创建新的文件
+            return False
+        return (stat.st_dev, stat.st_ino) != self.ident
+
+    def same(self, segment: str) -> bool:
+        """
+        备份文件是否为打开的文件, 打开之后轮转并压缩时inode不同, 比较文件开头的数据
+        Args:
+            segment: 备份文件
+        Returns:
+
+        """
+        try:
+            stat = os.stat(segment)
+        except OSError:
+            return False
+        if (stat.st_dev, stat.st_ino) == self.ident:
+            return True
+        head = _read_head(segment, _HEAD_BYTES)
+        if not head:
+            return False
+        pos = self.fp.tell()
+        self.fp.seek(0)
+        data = self.fp.read(len(head))
+        self.fp.seek(pos)
+        return data == head
+
+    def older(self, backups: List[str]) -> List[str]:
+        """
+        比打开的文件更早的备份文件, 打开之后发生了轮转时打开的文件已经是备份文件, 之后的备份文件在打开的文件轮转后读取
+        Args:
+            backups: 从旧到新的备份文件
+        Returns:
+
+        """
+        for position, segment in enumerate(backups):
+            if self.same(segment):
+                return backups[:position]
+        return backups
+
+    def close(self):
+        self.fp.close()
+
+
+def _newer_backups(filename: str, head: bytes, live: _LiveFile) -> List[str]:
+    """
+    当前文件轮转后, 找到比已经读完的文件更新的备份文件, 两次检查之间发生了多次轮转时这些文件中的日志还没有读取
+    Args:
+        filename: 日志文件
+        head: 已经读完的文件开头的数据
+        live: 新打开的当前文件
+    Returns:
+        从旧到新的备份文件
+    """
+    backups = [segment for segment in list_segments(filename) if segment != filename]
+    if not head:
+        return []
+    for position in range(len(backups) - 1, -1, -1):
+        if _read_head(backups[position], len(head)) == head:
+            return live.older(backups[position + 1:])
+    # 已经读完的文件被删除, 无法确定更新的备份文件
+    return []
+
+
+def _follow(filename: str, live: _LiveFile, timeout: Optional[float], interval: float
+            ) -> Iterator[logging.LogRecord]:
+    """
+    跟随读取当前日志文件, 轮转时读完旧文件, 再读取期间轮转出的备份文件, 之后读取新文件
+    Args:
+        filename: 日志文件
+        live: 已经打开的当前日志文件
+        timeout: 没有新日志的秒数超过该值时结束, 为None时一直读取
+        interval: 检查新日志和轮转的间隔秒数
+    Returns:
+
+    """
+    last_read = time.monotonic()
+    idle = False
+    try:
+        while True:
+            records = live.read()
+            if records is not None:
+                yield from records
+                last_read, idle = time.monotonic(), False
+                continue
+            if live.rotated(filename):
+                yield from live.drain()
+                new_live = _LiveFile(filename)
+                for segment in _newer_backups(filename, live.head, new_live):
+                    try:
+                        fp = _open_segment(segment)
+                    except FileNotFoundError:
+                        continue
+                    with fp:
+                        yield from _read_file(fp)
+                live.close()
+                live = new_live
+                continue
+            # 连续两次没有新数据时上一条日志已经写完, 比如文本日志的异常调用栈
+            if idle:
+                yield from live.end(False)
+            if timeout is not None and time.monotonic() - last_read >= timeout:
+                yield from live.end(False)
+                return
+            idle = True
+            time.sleep(interval)
+    finally:
+        live.close()
+
+
+def read_records(filename: str, follow: bool = False, backups: bool = True, timeout: float = None,
+                 interval: float = READER_INTERVAL) -> Iterator[logging.LogRecord]:
+    """
+    按顺序读取日志文件及其轮转后的备份文件, 还原为日志记录, 支持文本, json和二进制格式, 以及压缩的备份文件.
+
+    日志记录包含created, levelname, levelno, name, funcName, lineno和msg, 通过getMessage()获取消息. 文本和json格式的时间
+    只精确到秒; 文本格式的上下文字段和异常调用栈包含在消息中; json格式的上下文字段和extra字段为日志记录的属性.
+    文件分块读取, 内存占用和文件大小无关.
+    Args:
+        filename: 当前日志文件, 比如test.log
+        follow: 读完之后继续读取新写入的日志, 文件轮转时读完旧文件再读取新文件, 不遗漏日志
+        backups: 先读取轮转后的备份文件, 为False时只读取当前文件
+        timeout: 跟随读取时没有新日志的秒数超过该值时结束, 为None时一直读取
+        interval: 跟随读取时检查新日志和轮转的间隔秒数
+    Returns:
+
+    """
+    live = _LiveFile(filename) if follow else None
+    try:
+        with contextlib.ExitStack() as stack:
+            segments = list_segments(filename) if backups else []
+            if live is not None:
+                segments = live.older([segment for segment in segments if segment != filename])
+            elif filename not in segments:
+                segments.append(filename)
+            # 先打开所有文件, 读取期间发生轮转时已经打开的文件不受改名和压缩的影响
+            files = []
+            for segment in segments:
+                try:
+                    files.append(stack.enter_context(_open_segment(segment)))
+                except FileNotFoundError:
+                    if segment == filename:
+                        raise
+            for fp in files:
+                yield from _read_file(fp)
+                fp.close()
+        if live is not None:
+            yield from _follow(filename, live, timeout, interval)
+    finally:
+        if live is not None:
+            live.close()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午4:30
+"""
+import logging
+from typing import Tuple
+
+__all__ = ("AelogRecord",)
+
+
+class AelogRecord(logging.LogRecord):
+    """
+    aelog多参数日志的记录, 保存原始的参数, 第一次需要消息时才拼接并缓存在记录上, 多个handler共用同一个消息.
+    """
+
+    def __init__(self, name: str, level: int, pathname: str, lineno: int, msg, args: Tuple, exc_info, func: str = None,
+                 sinfo: str = None, sep: str = " "):
+        """
+        aelog多参数日志的记录
+        Args:
+            name: logger name
+            level: log level
+            pathname: 调用方文件
+            lineno: 调用方行号
+            msg: 要打印消息内容
+            args: 要打印的其他消息内容
+            exc_info: 异常信息
+            func: 调用方函数
+            sinfo: 调用栈信息
+            sep: 多个消息的分隔符
+        Returns:
+
+        """
+        # args不传给父类, 避免只有一个字典参数时被当做格式化参数展开
+        super().__init__(name, level, pathname, lineno, msg, (), exc_info, func, sinfo)
+        self.args = args
+        self.sep = sep
+        self._message = None
+
+    def getMessage(self) -> str:
+        """
+        拼接消息, 只在第一次调用时拼接
+        Args:
+
+        Returns:
+
+        """
+        if self._message is None:
+            if self.args:
+                self._message = f"{self.sep}".join(str(val) for val in (self.msg, *self.args))
+            else:
+                self._message = str(self.msg)
+        return self._message
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 上午10:20
+"""
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple, Union
+
+from .consts import (FLUSH_INTERVAL, QUEUE_SIZE, SHIP_BACKOFF_MAX, SHIP_BATCH_BYTES, SHIP_BATCH_SIZE,
+                     SHIP_FORMAT_NDJSON, SHIP_FORMAT_SYSLOG, SHIP_FORMATS, SHIP_SPILL_BYTES, SHIP_TIMEOUT)
+
+__all__ = ("ShippingHandler", "parse_address")
+
+# 日志级别到syslog severity, facility为user(1)
+_SYSLOG_SEVERITY = {logging.DEBUG: 7, logging.INFO: 6, logging.WARNING: 4, logging.ERROR: 3, logging.CRITICAL: 2}
+_SYSLOG_FACILITY = 1
+_STOP = object()
+_SPILL_CHUNK = 256 * 1024
+
+
+def parse_address(address: Union[str, Tuple[str, int]]) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    解析日志收集端的地址, 支持host:port, tcp://host:port和unix:/path/to/socket
+    Args:
+        address: 地址
+    Returns:
+        socket的地址族和地址
+    """
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp://"):
+        address = address[len("tcp://"):]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"日志收集端地址{address}格式错误, 应该为host:port或者unix:/path")
+    return socket.AF_INET, (host.strip("[]") or "localhost", int(port))
+
+
+class ShippingHandler(logging.Handler):
+    """
+    通过TCP或者unix socket把日志发送到日志收集端, 每行一个json(ndjson)或者RFC 5425的syslog octet counting格式.
+
+    调用方只格式化日志并放入队列, 由后台线程按数量, 字节数和时间批量发送, 连接一直保持. 发送失败时按指数退避重连,
+    重连之前的日志追加到本地的spill文件, 连接恢复后先发送spill文件中的日志. 连接断开时已经发出的部分可能会重复发送.
+    """
+
+    def __init__(self, address: Union[str, Tuple[str, int]], ship_format: str = SHIP_FORMAT_NDJSON,
+                 batch_size: int = SHIP_BATCH_SIZE, batch_bytes: int = SHIP_BATCH_BYTES,
+                 flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE, spill_file: str = None,
+                 spill_bytes: int = SHIP_SPILL_BYTES, backoff_max: float = SHIP_BACKOFF_MAX,
+                 timeout: float = SHIP_TIMEOUT, app_name: str = "aelog"):
+        """
+        批量发送日志到收集端的handler
+        Args:
+            address: 收集端的地址, host:port, tcp://host:port或者unix:/path/to/socket
+            ship_format: 发送的格式, ndjson或syslog
+            batch_size: 每批最多发送的日志数量
+            batch_bytes: 每批最多发送的字节数
+            flush_interval: 第一条日志最多等待的秒数, 超过后不满一批也发送
+            queue_size: 等待发送的日志数量上限, 超过时丢弃
+            spill_file: 收集端不可用时保存日志的本地文件, 为None时丢弃
+            spill_bytes: spill文件的大小上限, 超过时丢弃
+            backoff_max: 重连的最大间隔秒数
+            timeout: 连接和发送的超时秒数
+            app_name: syslog格式中的APP-NAME
+        Returns:
+
+        """
+        if ship_format not in SHIP_FORMATS:
+            raise ValueError(f"参数ship_format必须为{SHIP_FORMATS}中的一个")
+        super().__init__()
+        self.family, self.address = parse_address(address)
+        self.ship_format = ship_format
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.spill_file = spill_file
+        self.spill_bytes = spill_bytes
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.app_name = app_name
+        self.hostname = socket.gethostname() or "-"
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.dropped = 0  # 队列满或者spill文件满时丢弃的日志数量
+        self.sock: Optional[socket.socket] = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._pid = os.getpid()
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self):
+        """
+        第一次输出日志时启动后台发送线程, fork之后子进程中重新启动
+        Args:
+
+        Returns:
+
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.queue = queue.Queue(self.queue.maxsize)
+            self.sock = None
+        self._thread = threading.Thread(target=self._run, name="aelog-ship", daemon=True)
+        self._thread.start()
+
+    def frame(self, record: logging.LogRecord) -> bytes:
+        """
+        把日志记录格式化为一个完整的帧, 帧可以直接拼接发送
+        Args:
+            record: log record
+        Returns:
+
+        """
+        msg = self.format(record)
+        if self.ship_format == SHIP_FORMAT_NDJSON:
+            return f"{msg}\n".encode("utf-8")
+        severity = _SYSLOG_SEVERITY.get(record.levelno, 5)
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        data = (f"<{_SYSLOG_FACILITY * 8 + severity}>1 {timestamp} {self.hostname} {self.app_name} "
+                f"{record.process} {record.name} - {msg}").encode("utf-8")
+        return b"%d %s" % (len(data), data)
+
+    def emit(self, record: logging.LogRecord):
+        """
+        在调用方格式化日志后放入队列, 不等待发送, 队列满时丢弃
+        Args:
+            record: log record
+        Returns:
+
+        """
+        try:
+            data = self.frame(record)
+            if self._thread is None or self._pid != os.getpid():
+                self._start()
+            try:
+                self.queue.put_nowait(data)
+            except queue.Full:
+                self.dropped += 1
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self, timeout: float = None):
+        """
+        等待队列中的日志发送完成或者写入spill文件
+        Args:
+            timeout: 最多等待的秒数, 默认为连接超时的两倍
+        Returns:
+
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=self.timeout)
+        except queue.Full:  # pragma: no cover
+            return
+        done.wait(self.timeout * 2 if timeout is None else timeout)
+
+    def _collect(self) -> Tuple[List[bytes], List, bool]:
+        """
+        从队列中取出一批日志, 满足数量或字节数, 或者第一条日志等待超过flush_interval时返回
+        Args:
+
+        Returns:
+            日志帧列表, flush的event列表和是否停止
+        """
+        frames: List[bytes] = []
+        events: List = []
+        size = 0
+        deadline = None
+        while len(frames) < self.batch_size and size < self.batch_bytes:
+            try:
+                if deadline is None:
+                    item = self.queue.get()
+                else:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return frames, events, True
+            if isinstance(item, threading.Event):
+                # flush时把之前的日志立即发送
+                events.append(item)
+                break
+            frames.append(item)
+            size += len(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return frames, events, False
+
+    def _run(self):
+        """
+        后台线程批量发送日志
+        Args:
+
+        Returns:
+
+        """
+        stopped = False
+        while not stopped:
+            frames, events, stopped = self._collect()
+            if frames or events:
+                self._ship(b"".join(frames), len(frames))
+            for event in events:
+                event.set()
+        self._close_socket()
+
+    def _connect(self) -> bool:
+        """
+        连接收集端, 在退避时间内不重连, 连接成功后先发送spill文件中的日志
+        Args:
+
+        Returns:
+            是否已经连接
+        """
+        if self.sock is not None:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            sock.close()
+            self._fail()
+            return False
+        self.sock = sock
+        self._backoff = 0.0
+        return self._send_spill()
+
+    def _fail(self):
+        """
+        关闭连接并增加重连的退避时间
+        Args:
+
+        Returns:
+
+        """
+        self._close_socket()
+        self._backoff = min(max(self._backoff * 2, 0.1), self.backoff_max)
+        self._retry_at = time.monotonic() + self._backoff
+
+    def _close_socket(self):
+        """
+        关闭连接
+        Args:
+
+        Returns:
+
+        """
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:  # pragma: no cover
+                pass
+            self.sock = None
+
+    def _send_spill(self) -> bool:
+        """
+        发送spill文件中的日志, 全部发送成功后删除spill文件
+        Args:
+
+        Returns:
+            是否发送成功
+        """
+        if self.spill_file is None or not os.path.exists(self.spill_file):
+            return True
+        try:
+            with open(self.spill_file, "rb") as fp:
+                for chunk in iter(lambda: fp.read(_SPILL_CHUNK), b""):
+                    self.sock.sendall(chunk)
+        except OSError:
+            self._fail()
+            return False
+        os.remove(self.spill_file)
+        return True
+
+    def _ship(self, data: bytes, count: int):
+        """
+        发送一批日志, 无法发送时写入spill文件
+        Args:
+            data: 拼接好的日志帧
+            count: 日志数量
+        Returns:
+
+        """
+        if not data:
+            return
+        if self._connect():
+            try:
+                self.sock.sendall(data)
+                return
+            except OSError:
+                self._fail()
+        self._spill(data, count)
+
+    def _spill(self, data: bytes, count: int):
+        """
+        把无法发送的日志追加到spill文件
+        Args:
+            data: 拼接好的日志帧
+            count: 日志数量
+        Returns:
+
+        """
+        if self.spill_file is None:
+            self.dropped += count
+            return
+        try:
+            with open(self.spill_file, "ab") as fp:
+                if fp.tell() + len(data) > self.spill_bytes:
+                    self.dropped += count
+                    return
+                fp.write(data)
+        except OSError:
+            self.dropped += count
+
+    def close(self):
+        """
+        发送队列中剩余的日志后停止后台线程并关闭连接, 无法发送的日志写入spill文件
+        Args:
+
+        Returns:
+
+        """
+        self.acquire()
+        try:
+            thread, self._thread = self._thread, None
+        finally:
+            self.release()
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self.queue.put(_STOP)
+            thread.join(self.timeout * 2)
+        super().close()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午3:20
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional, TYPE_CHECKING
+
+from . import metrics
+from .consts import WRITER_BATCH_SIZE
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+
+__all__ = ("AsyncWriter",)
+
+_STOP = object()
+
+
+class AsyncWriter(object):
+    """
+    async_*日志的后台输出线程, 调用方只把日志记录放入队列后立即返回, 由一个线程批量输出.
+    """
+
+    def __init__(self, batch_size: int = WRITER_BATCH_SIZE):
+        """
+        async_*日志的后台输出线程
+        Args:
+            batch_size: 每次从队列中最多取出的日志数量
+        Returns:
+
+        """
+        self.batch_size = batch_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            # fork之后子进程中没有后台线程, 需要重新启动
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """
+        子进程中丢弃父进程的队列和线程状态
+        Args:
+
+        Returns:
+
+        """
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """
+        第一次输出日志时启动后台线程
+        Args:
+
+        Returns:
+
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="aelog-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def put(self, logger: logging.Logger, record: logging.LogRecord):
+        """
+        放入要输出的日志记录, 不会阻塞
+        Args:
+            logger: 输出日志的logger
+            record: log record
+        Returns:
+
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put((logger, record))
+
+    def flush(self) -> "Future":
+        """
+        等待之前放入的日志全部输出
+        Args:
+
+        Returns:
+            之前的日志全部输出后完成的future
+        """
+        from concurrent.futures import Future
+
+        future = Future()
+        if self._thread is None:
+            future.set_result(None)
+        else:
+            self._queue.put(future)
+        return future
+
+    def qsize(self) -> int:
+        """
+        队列中等待输出的日志数量, 近似值
+        Args:
+
+        Returns:
+
+        """
+        return self._queue.qsize()
+
+    def close(self):
+        """
+        输出队列中剩余的日志并停止后台线程, 进程退出时自动调用
+        Args:
+
+        Returns:
+
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        """
+        批量取出日志记录并输出
+        Args:
+
+        Returns:
+
+        """
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            for item in batch:
+                if item is _STOP:
+                    stopped = True
+                    continue
+                if type(item) is not tuple:
+                    # flush放入的future
+                    item.set_result(None)
+                    continue
+                logger, record = item
+                if metrics.enabled:
+                    metrics.observe("writer_wait_seconds", "", time.time() - record.created)
+                try:
+                    logger.handle(record)
+                except Exception:  # pragma: no cover, handler内部已经处理了输出异常
+                    pass
@@ -37,10 +37,11 @@ setup(name='aelog',
       author_email='a598824322@qq.com',
       url='https://github.com/tinybees/aelog',
       packages=['aelog'],
-      entry_points={},
+      entry_points={"console_scripts": ["aelog=aelog.__main__:main"]},
       requires=['colorlog'],
       install_requires=["colorlog>=3.1.0"],
-      python_requires=">=3.6",
+      extras_require={"json": ["orjson"], "zstd": ["zstandard"]},
+      python_requires=">=3.7",
       keywords="log, logging, colored, async, asynchronous, simple, rotating",
       license='MIT',
       classifiers=[
@@ -54,7 +55,6 @@ setup(name='aelog',
           'Topic :: Software Development :: Libraries :: Python Modules',
           'Topic :: Utilities',
           'Programming Language :: Python',
-          'Programming Language :: Python :: 3.6',
           'Programming Language :: Python :: 3.7',
           'Programming Language :: Python :: 3.8']
       )
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 上午10:12
+
+aelog微基准测试, 不会被pytest收集, 直接运行: python -m tests.bench_aelog
+"""
+
+import inspect
+import logging
+import os
+import sys
+import tempfile
+import time
+import timeit
+from logging.handlers import RotatingFileHandler
+
+import aelog
+from aelog.formatters import PlainFormatter, format_exception
+from aelog.handlers import BufferedRotatingFileHandler, MmapRotatingFileHandler
+
+
+def bench(name: str, stmt, number: int = 100000):
+    """
+    运行并打印单次调用的平均耗时
+    Args:
+        name: 测试名称
+        stmt: 要测试的函数
+        number: 调用次数
+    Returns:
+
+    """
+    cost = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"{name:<40} {cost * 1e9:>10.1f} ns/call")
+    return cost
+
+
+def bench_disabled_level():
+    """
+    级别关闭时的调用耗时, 对比标准库logger.debug
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_level="INFO")
+    logger = logging.getLogger(__name__)
+    payload = {"key": list(range(100))}
+    bench("logging.Logger.debug (disabled)", lambda: logger.debug("message %s", payload))
+    bench("aelog.debug (disabled)", lambda: aelog.debug("message", payload))
+
+
+def bench_caller_logger():
+    """
+    调用方logger的解析耗时, 对比inspect.getmodule和code object缓存
+    Args:
+
+    Returns:
+
+    """
+    # noinspection PyProtectedMember
+    from aelog.aelog import _caller_logger
+
+    def getmodule_logger():
+        caller_module = inspect.getmodule(sys._getframe(0))
+        return logging.getLogger(caller_module.__name__ if caller_module else "")
+
+    def cached_logger():
+        return _caller_logger(sys._getframe(0))
+
+    bench("inspect.getmodule + getLogger (before)", getmodule_logger, number=20000)
+    bench("code object cache (after)", cached_logger)
+
+
+def bench_enabled_level():
+    """
+    级别打开时完整的调用耗时, 输出到NullHandler
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_level="DEBUG")
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [logging.NullHandler()]
+    try:
+        bench("aelog.info (enabled, NullHandler)", lambda: aelog.info("message", 1, [1, 2, 3]), number=20000)
+    finally:
+        logging.root.handlers = root_handlers
+
+
+def bench_file_handler(lines: int = 200000):
+    """
+    日志文件的写入速度, 对比RotatingFileHandler, 带缓冲的handler和mmap的handler
+    Args:
+        lines: 写入的日志行数
+    Returns:
+
+    """
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "access log message %s", ("x" * 60,), None)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, handler in (
+                ("RotatingFileHandler", RotatingFileHandler(os.path.join(tmp_dir, "rotating.log"),
+                                                            maxBytes=100 * 1024 * 1024, encoding="utf8")),
+                ("BufferedRotatingFileHandler", BufferedRotatingFileHandler(
+                    os.path.join(tmp_dir, "buffered.log"), maxBytes=100 * 1024 * 1024, encoding="utf8")),
+                ("MmapRotatingFileHandler", MmapRotatingFileHandler(
+                    os.path.join(tmp_dir, "mmap.log"), maxBytes=100 * 1024 * 1024, encoding="utf8"))):
+            start = time.perf_counter()
+            for _ in range(lines):
+                handler.handle(record)
+            handler.close()
+            cost = time.perf_counter() - start
+            print(f"{name:<40} {lines / cost:>10.0f} lines/sec")
+
+
+def bench_formatter():
+    """
+    每条日志的格式化耗时, 对比colorlog, 标准库formatter和无颜色的formatter
+    Args:
+
+    Returns:
+
+    """
+    import colorlog
+
+    fmt = "%(asctime)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(message)s"
+    datefmt = "[%Y-%m-%d %H:%M:%S %z]"
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "access log message", (), None, "bench")
+    for name, formatter in (
+            ("colorlog.ColoredFormatter", colorlog.ColoredFormatter(
+                "%(asctime)s %(log_color)s [%(levelname)s] %(name)s [%(funcName)s %(lineno)d]: %(message)s",
+                datefmt, force_color=True)),
+            ("logging.Formatter", logging.Formatter(fmt, datefmt)),
+            ("PlainFormatter", PlainFormatter(fmt, datefmt))):
+        bench(name, lambda: formatter.format(record), number=50000)
+
+
+def bench_exception(depth: int = 30):
+    """
+    异常调用栈的格式化耗时, 对比标准库和按代码位置缓存的格式化
+    Args:
+        depth: 调用栈的深度
+    Returns:
+
+    """
+
+    def nested(level):
+        return 1 / 0 if level == 0 else nested(level - 1)
+
+    try:
+        nested(depth)
+    except ZeroDivisionError:
+        ei = sys.exc_info()
+    formatter = logging.Formatter()
+    bench("logging.Formatter.formatException", lambda: formatter.formatException(ei), number=1000)
+    bench("aelog.formatters.format_exception", lambda: format_exception(ei), number=1000)
+
+
+if __name__ == '__main__':
+    bench_disabled_level()
+    bench_caller_logger()
+    bench_enabled_level()
+    bench_file_handler()
+    bench_formatter()
+    bench_exception()
@@ -7,7 +7,13 @@
 @time: 18-3-26 上午11:37
 """
 
+import asyncio
+import logging
+import sys
+import threading
+
 import aelog
+from aelog.consts import LOGGER_CACHE_SIZE
 
 
 def test_aelog_output_console():
@@ -61,3 +67,218 @@ async def test_async_output():
         5 / 0
     except Exception as e:
         await aelog.async_exception(e)
+
+
+class ListHandler(logging.Handler):
+    """
+    收集日志记录的handler
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_level_gate():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_level="INFO")
+    handler = ListHandler()
+    root_level = logging.root.level
+    logging.root.addHandler(handler)
+    try:
+        aelog.debug("disabled debug message", {1: 1})
+        assert handler.records == []
+        logging.root.setLevel(logging.DEBUG)
+        aelog.debug("enabled debug message", {1: 1})
+        assert [record.getMessage() for record in handler.records] == ["enabled debug message {1: 1}"]
+        logging.disable(logging.INFO)
+        aelog.info("disabled info message")
+        assert len(handler.records) == 1
+    finally:
+        logging.disable(logging.NOTSET)
+        logging.root.setLevel(root_level)
+        logging.root.removeHandler(handler)
+
+
+def test_caller_logger_cache():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    # noinspection PyProtectedMember
+    from aelog.aelog import _caller_logger, _logger_cache
+
+    frame = sys._getframe(0)
+    logger = _caller_logger(frame)
+    assert logger.name == __name__
+    assert _logger_cache[(frame.f_code, __name__)] is logger
+
+    code = compile("import sys\nframe = sys._getframe(0)", "<shared>", "exec")
+    for name in ("tests.first", "tests.second"):
+        namespace = {"__name__": name}
+        exec(code, namespace)
+        assert _caller_logger(namespace["frame"]).name == name
+
+    namespace = {"__name__": "tests.reloaded"}
+    for index in range(LOGGER_CACHE_SIZE + 10):
+        exec(compile(f"import sys\nframe_{index} = sys._getframe(0)", "<reloaded>", "exec"), namespace)
+        assert _caller_logger(namespace[f"frame_{index}"]).name == "tests.reloaded"
+    assert len(_logger_cache) == LOGGER_CACHE_SIZE
+    assert (frame.f_code, __name__) not in _logger_cache
+
+
+def test_caller_line_thread_safe():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_level="INFO")
+    handler = ListHandler()
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [handler]
+    try:
+        callers = []
+        for lineno in range(1, 33):
+            namespace = {"aelog": aelog, "__name__": __name__}
+            code = "\n" * (lineno - 1) + "def call(index):\n    aelog.info(index)"
+            exec(compile(code, "<stress>", "exec"), namespace)
+            callers.append((lineno + 1, namespace["call"]))
+
+        def worker(lineno, call):
+            for _ in range(200):
+                call(lineno)
+
+        threads = [threading.Thread(target=worker, args=caller) for caller in callers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        async_lineno = sys._getframe(0).f_lineno + 4
+
+        async def async_worker(index):
+            for _ in range(20):
+                await aelog.async_info(index)
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(*(async_worker(index) for index in range(10)))
+            await aelog.flush()
+
+        asyncio.run(main())
+    finally:
+        logging.root.handlers = root_handlers
+
+    assert len(handler.records) == len(callers) * 200 + 10 * 20
+    for record in handler.records[:len(callers) * 200]:
+        assert record.lineno == int(record.getMessage())
+        assert record.funcName == "call"
+    for record in handler.records[len(callers) * 200:]:
+        assert record.lineno == async_lineno
+        assert record.funcName == "async_worker"
+
+
+def test_async_flush():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_level="DEBUG")
+    handler = ListHandler()
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [handler]
+
+    async def main():
+        for index in range(1000):
+            await aelog.async_debug("async message", index)
+        await aelog.flush()
+        return [record.getMessage() for record in handler.records if record.name == __name__]
+
+    try:
+        assert asyncio.run(main()) == [f"async message {index}" for index in range(1000)]
+    finally:
+        logging.root.handlers = root_handlers
+
+
+def test_lazy_message():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+
+    class Payload(object):
+        calls = 0
+
+        def __str__(self):
+            Payload.calls += 1
+            return "payload"
+
+    aelog.init_app(aelog_level="DEBUG")
+    error_handler, access_handler = ListHandler(), ListHandler()
+    error_handler.setLevel(logging.ERROR)
+    formatter = logging.Formatter("%(message)s")
+    error_handler.setFormatter(formatter)
+    access_handler.setFormatter(formatter)
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [error_handler]
+    try:
+        aelog.info("filtered message", Payload())
+        assert Payload.calls == 0
+        logging.root.handlers = [error_handler, access_handler]
+        aelog.error("error message", Payload(), {"key": "value"})
+        assert [formatter.format(record) for record in error_handler.records + access_handler.records] == [
+            "error message payload {'key': 'value'}"] * 2
+        assert Payload.calls == 1
+    finally:
+        logging.root.handlers = root_handlers
+
+
+def test_init_app_reuse_config(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = str(tmp_path / "reuse.log")
+    aelog.init_app(aelog_access_file=access_file, aelog_console=False)
+    handlers = logging.root.handlers[:]
+    aelog.init_app(aelog_access_file=access_file, aelog_console=False)
+    assert all(new is old for new, old in zip(logging.root.handlers, handlers))
+    aelog.info("reuse message")
+
+    # 配置变化或者handler已经关闭时重新配置
+    aelog.init_app(aelog_access_file=access_file, aelog_console=False, aelog_level="INFO")
+    assert not set(logging.root.handlers) & set(handlers)
+    handlers = logging.root.handlers[:]
+    logging.shutdown()
+    aelog.init_app(aelog_access_file=access_file, aelog_console=False, aelog_level="INFO")
+    assert not set(logging.root.handlers) & set(handlers)
+    aelog.info("reconfigured message")
+    logging.shutdown()
+    with open(access_file) as fp:
+        assert [line.split("]: ", 1)[1] for line in fp.read().splitlines()] == [
+            "reuse message", "reconfigured message"]
+    aelog.init_app()
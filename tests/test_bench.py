@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午8:40
+"""
+
+import json
+
+from aelog import bench
+
+
+def test_bench_report(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    output = tmp_path / "bench.json"
+    bench.main(["-n", "200", "-o", str(output)] + [name for name, _, _ in bench.BENCHMARKS])
+    report = json.loads(output.read_text())
+    assert report["number"] == 200
+    assert list(report["results"]) == [name for name, _, _ in bench.BENCHMARKS]
+    cold_start = report["results"].pop("cold_start")
+    assert cold_start["runs"] >= 1
+    assert 0 < cold_start["import_ms"]["p50"] <= cold_start["import_ms"]["max"]
+    assert 0 < cold_start["first_log_ms"]["p50"] <= cold_start["first_log_ms"]["max"]
+    for result in report["results"].values():
+        assert result["calls"] >= bench.BATCH
+        assert result["calls_per_sec"] > 0
+        latency = result["latency_ns"]
+        assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+
+
+def test_cold_start_lazy_modules(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    result = bench.bench_cold_start(bench.BATCH, str(tmp_path))
+    assert result["runs"] == 1
+    # 导入aelog并输出到文件时不导入asyncio, colorlog和线程池
+    assert set(result["lazy_modules_loaded"]) <= {"logging.config"}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午4:00
+"""
+
+import json
+import logging
+from logging.handlers import RotatingFileHandler
+
+import aelog
+from aelog.__main__ import main
+from aelog.binary import BinaryRotatingFileHandler, decode_file
+from aelog.consts import FILE_DATE_FORMAT, FILE_LOG_FORMAT
+from aelog.context import ContextFilter
+from aelog.formatters import PlainFormatter
+
+
+def write_logs():
+    """
+    写入各种参数和格式的日志
+    Args:
+
+    Returns:
+
+    """
+    logger = logging.getLogger("tests.binary")
+    for index in range(50):
+        aelog.info("request", index, 0.5, None, True, {"path": "/"})
+        logger.warning("user %s status %d cost %.2f", "u1", -index, 1.25)
+    logger.info("mapping %(key)s", {"key": "value"})
+    logger.info("object %s", object)
+    token = aelog.bind(request_id="r1")
+    aelog.error("bound message")
+    token.var.reset(token)
+    logger.info("extra message", extra={"tag": "x"})
+    try:
+        1 / 0
+    except ZeroDivisionError as e:
+        aelog.exception(e)
+
+
+def test_binary_decode_same_as_text(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    binary_file, text_file = tmp_path / "binary.log", tmp_path / "text.log"
+    aelog.init_app(aelog_level="DEBUG")
+    binary_handler = BinaryRotatingFileHandler(str(binary_file))
+    text_handler = RotatingFileHandler(str(text_file), encoding="utf8")
+    text_handler.setFormatter(PlainFormatter(FILE_LOG_FORMAT, FILE_DATE_FORMAT))
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [binary_handler, text_handler]
+    for handler in logging.root.handlers:
+        handler.addFilter(ContextFilter())
+    try:
+        write_logs()
+    finally:
+        logging.root.handlers = root_handlers
+        binary_handler.close()
+        text_handler.close()
+
+    assert "\n".join(decode_file(str(binary_file))) + "\n" == text_file.read_text()
+    assert binary_file.stat().st_size * 2 < text_file.stat().st_size
+    aelog.init_app()
+
+
+def test_binary_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "binary.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_format="binary",
+                   aelog_max_bytes=1024, aelog_backup_count=20, aelog_compress="gzip")
+    for index in range(100):
+        aelog.info("rotated message", index)
+    logging.shutdown()
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_format="binary")
+    aelog.info("reopened message", 100)
+    logging.shutdown()
+
+    backups = sorted(tmp_path.glob("binary.log.*.gz"), key=lambda path: -int(path.name.split(".")[2]))
+    assert backups
+    output = tmp_path / "decoded.json"
+    main(["decode", *map(str, backups), str(access_file), "--format", "json", "-o", str(output)])
+    messages = [json.loads(line)["message"] for line in output.read_text().splitlines()]
+    assert messages == [f"rotated message {index}" for index in range(100)] + ["reopened message 100"]
+
+    # 末尾不完整的记录被忽略
+    with open(access_file, "ab") as fp:
+        fp.write(b"\x02\x20partial")
+    assert list(decode_file(str(access_file)))[-1].endswith("reopened message 100")
+    aelog.init_app()
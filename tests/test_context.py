@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午7:50
+"""
+
+import asyncio
+import json
+import logging
+
+import aelog
+
+
+def test_bind_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "context.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False)
+
+    async def handle_request(request_id):
+        aelog.bind(request_id=request_id)
+        await asyncio.sleep(0)
+        await aelog.async_info("async message")
+        aelog.info("sync message")
+
+    async def main():
+        await asyncio.gather(*(handle_request(f"r{index}") for index in range(3)))
+        await aelog.flush()
+
+    asyncio.run(main())
+    token = aelog.bind(user="u1", request_id="r9")
+    aelog.unbind("request_id")
+    assert aelog.get_context() == {"user": "u1"}
+    aelog.warning("bound message")
+    logging.getLogger("tests.context").warning("stdlib message")
+    token.var.reset(token)
+    aelog.error("unbound message")
+    logging.shutdown()
+
+    lines = access_file.read_text().splitlines()
+    messages = sorted(line.split("]: ", 1)[1] for line in lines if "asyncio" not in line)
+    assert messages == sorted([f"request_id=r{index} {kind} message" for index in range(3)
+                               for kind in ("async", "sync")] + [
+        "user=u1 bound message", "user=u1 stdlib message", "unbound message"])
+    aelog.init_app()
+
+
+def test_bind_json_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "context.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_format="json",
+                   aelog_queue=True)
+    token = aelog.bind(request_id="r1", level="ignored")
+    try:
+        aelog.info("json message")
+    finally:
+        token.var.reset(token)
+    logging.shutdown()
+
+    data = json.loads(access_file.read_text())
+    assert data["request_id"] == "r1"
+    assert data["level"] == "INFO"
+    assert "context" not in data and "context_text" not in data
+    aelog.init_app()
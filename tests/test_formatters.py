@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午5:20
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime
+
+import aelog
+from aelog.formatters import ColoredFormatter, JsonFormatter, PlainFormatter, format_exception
+from aelog.log import sanic_log_config
+
+
+def test_plain_formatter_time_cache():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    formatter = PlainFormatter("%(asctime)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    record = logging.LogRecord("tests", logging.INFO, __file__, 1, "message", (), None)
+    record.created = 1600000000.1
+    first = formatter.format(record)
+    record.created = 1600000000.9
+    assert formatter.format(record) == first
+    record.created = 1600000001.0
+    assert formatter.format(record) != first
+    assert formatter.format(record) == logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S").format(record)
+
+
+def test_plain_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "plain.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=True)
+    aelog.error("plain message")
+    logging.shutdown()
+    for path in (access_file, tmp_path / "plain_error.log"):
+        content = path.read_text()
+        assert "\x1b[" not in content
+        assert "[ERROR] tests.test_formatters [test_plain_output_file" in content
+    aelog.init_app()
+
+
+def test_json_formatter():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    formatter = JsonFormatter()
+    record = logging.LogRecord("tests", logging.INFO, __file__, 10, "message %s", ("arg",), None, "func")
+    record.request_id = "abc"
+    data = json.loads(formatter.format(record))
+    assert data["level"] == "INFO" and data["name"] == "tests"
+    assert data["func"] == "func" and data["lineno"] == 10
+    assert data["message"] == "message arg" and data["request_id"] == "abc"
+    assert "exception" not in data
+
+    try:
+        5 / 0
+    except ZeroDivisionError:
+        record = logging.LogRecord("tests", logging.ERROR, __file__, 10, "error", (), sys.exc_info())
+    assert "ZeroDivisionError" in json.loads(formatter.format(record))["exception"]
+
+
+def test_json_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "json.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_format="json")
+    aelog.info("json message", {"key": "value"})
+    try:
+        5 / 0
+    except ZeroDivisionError as e:
+        aelog.exception(e)
+    logging.shutdown()
+    records = [json.loads(line) for line in access_file.read_text().splitlines()]
+    assert [record["message"] for record in records] == ["json message {'key': 'value'}", "division by zero"]
+    assert "ZeroDivisionError" in records[1]["exception"]
+    error_record, = [json.loads(line) for line in (tmp_path / "json_error.log").read_text().splitlines()]
+    assert error_record["func"] == "test_json_output_file"
+    assert datetime.strptime(error_record["time"], "%Y-%m-%dT%H:%M:%S%z")
+
+    config = sanic_log_config(str(tmp_path / "sanic.log"), log_format="json")
+    assert config["handlers"]["access_file"]["formatter"] == "json"
+    assert config["handlers"]["error_file"]["formatter"] == "json"
+    aelog.init_app()
+
+
+def test_format_exception():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+
+    def nested(depth):
+        return {}["key"] if depth == 0 else nested(depth - 1)
+
+    infos = []
+    for index in range(3):
+        try:
+            try:
+                nested(5)
+            except KeyError as e:
+                raise ValueError(f"failed {index}") from e
+        except ValueError:
+            infos.append(sys.exc_info())
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            int("x")
+    except ValueError:
+        infos.append(sys.exc_info())
+
+    formatter = logging.Formatter()
+    for ei in infos:
+        assert format_exception(ei) == formatter.formatException(ei)
+    assert format_exception(infos[2]).endswith("ValueError: failed 2")
+
+
+def test_exception_shared_text():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    console, plain = ColoredFormatter("%(log_color)s%(message)s"), PlainFormatter("%(message)s")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = logging.LogRecord("tests", logging.ERROR, __file__, 1, "error", (), sys.exc_info())
+    console.format(record)
+    exc_text = record.exc_text
+    assert "\x1b[" not in exc_text
+    assert plain.format(record) == f"error\n{exc_text}"
+    assert record.exc_text is exc_text
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午2:40
+"""
+
+import gzip
+import logging
+import os
+import threading
+import time
+
+import aelog
+from aelog.handlers import (AelogQueueHandler, BufferedRotatingFileHandler, CompressRotatingFileHandler,
+                            CompressTimedRotatingFileHandler, MmapRotatingFileHandler,
+                            MultiprocessRotatingFileHandler, RingBufferHandler)
+
+
+class BlockingHandler(logging.Handler):
+    """
+    等待event之后才输出的handler
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.event = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.event.wait()
+        self.messages.append(record.getMessage())
+
+
+def test_queue_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "queue.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_queue=True)
+    queue_handler, = logging.root.handlers
+    assert isinstance(queue_handler, AelogQueueHandler)
+    for index in range(100):
+        aelog.info("queue message", index)
+    aelog.error("queue error message")
+    queue_handler.close()
+
+    lines = access_file.read_text().splitlines()
+    assert len(lines) == 101
+    assert "queue message 99" in lines[99]
+    assert "queue error message" in (tmp_path / "queue_error.log").read_text()
+    aelog.init_app()
+
+
+def test_queue_overflow_policy():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    for policy, expected in (("drop_newest", ["0", "1", "2"]), ("drop_oldest", ["0", "3", "4"])):
+        target = BlockingHandler()
+        target.name = f"aelog_test_{policy}"
+        handler = AelogQueueHandler([target.name], maxsize=2, policy=policy)
+        logger = logging.getLogger(f"tests.queue.{policy}")
+        logger.propagate = False
+        logger.addHandler(handler)
+        logger.warning("0")
+        while not handler.queue.empty():  # 等待后台线程取走第一条日志并阻塞
+            pass
+        for index in range(1, 5):
+            logger.warning(str(index))
+        assert handler.dropped == 2
+        target.event.set()
+        handler.close()
+        logger.removeHandler(handler)
+        assert target.messages == expected
+
+
+def test_buffered_file_handler(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    log_file = tmp_path / "buffered.log"
+    handler = BufferedRotatingFileHandler(str(log_file), maxBytes=1000, backupCount=5, encoding="utf8",
+                                          buffer_bytes=256, flush_interval=0)
+    logger = logging.getLogger("tests.buffered")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("message 0")
+        assert log_file.read_text() == ""
+        logger.error("error message")
+        assert log_file.read_text() == "message 0\nerror message\n"
+        for index in range(1, 200):
+            logger.warning("message %s", index)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    files = [log_file] + [tmp_path / f"buffered.log.{index}" for index in range(1, 3)]
+    assert not (tmp_path / "buffered.log.3").exists()
+    assert all(path.stat().st_size < 1000 for path in files)
+    lines = [line for path in reversed(files) for line in path.read_text().splitlines()]
+    assert lines == ["message 0", "error message"] + [f"message {index}" for index in range(1, 200)]
+
+
+def test_buffered_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "buffered.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_buffer_bytes=1024,
+                   aelog_flush_interval=0.05)
+    aelog.info("buffered message")
+    assert access_file.read_text() == ""
+    time.sleep(0.3)
+    assert "buffered message" in access_file.read_text()
+    aelog.init_app()
+
+
+def test_multiprocess_rotation(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    log_file = tmp_path / "multiprocess.log"
+    handler = MultiprocessRotatingFileHandler(str(log_file), maxBytes=4096, backupCount=1000, encoding="utf8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("tests.multiprocess")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    processes, lines = 4, 500
+    pids = []
+    for process in range(processes):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover, 子进程
+            try:
+                for index in range(lines):
+                    logger.warning("process %s line %s", process, index)
+                handler.close()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        assert os.waitpid(pid, 0)[1] == 0
+    logger.removeHandler(handler)
+    handler.close()
+
+    files = list(tmp_path.glob("multiprocess.log*"))
+    assert len(files) > 10
+    written = [line for path in files if not path.name.endswith(".lock") for line in path.read_text().splitlines()]
+    assert sorted(written) == sorted(f"process {process} line {index}"
+                                     for process in range(processes) for index in range(lines))
+    assert all(path.stat().st_size <= 4096 for path in files)
+
+
+def test_compress_rotation(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    log_file = tmp_path / "compress.log"
+    handler = CompressRotatingFileHandler(str(log_file), maxBytes=200, backupCount=3, encoding="utf8")
+    logger = logging.getLogger("tests.compress")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for index in range(100):
+            logger.warning("message %s", index)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert not (tmp_path / "compress.log.1").exists()
+    assert not (tmp_path / "compress.log.4.gz").exists()
+    lines = [line for index in range(3, 0, -1)
+             for line in gzip.decompress((tmp_path / f"compress.log.{index}.gz").read_bytes()).decode().splitlines()]
+    lines.extend(log_file.read_text().splitlines())
+    assert lines == [f"message {index}" for index in range(100 - len(lines), 100)]
+
+
+def test_timed_rotation(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_access_file=str(tmp_path / "timed.log"), aelog_console=False, aelog_rotate_when="hourly",
+                   aelog_compress="gzip")
+    handler = logging.root.handlers[0]
+    assert isinstance(handler, CompressTimedRotatingFileHandler)
+    aelog.info("before rollover")
+    handler.doRollover()
+    aelog.info("after rollover")
+    handler.wait_compress()
+    backup, = tmp_path.glob("timed.log.*.gz")
+    assert "before rollover" in gzip.decompress(backup.read_bytes()).decode()
+    assert "after rollover" in (tmp_path / "timed.log").read_text()
+    aelog.init_app()
+
+
+def test_ring_buffer_output_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "ring.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_ring_size=3)
+
+    def worker():
+        for index in range(5):
+            aelog.debug("worker debug", index)
+
+    for index in range(5):
+        aelog.info("main info", index)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    aelog.warning("main warning")
+    aelog.error("main error")
+    aelog.info("after error")
+    logging.shutdown()
+
+    access_lines = access_file.read_text().splitlines()
+    assert [line.rsplit(": ", 1)[1] for line in access_lines] == ["main warning", "main error"]
+    error_lines = (tmp_path / "ring_error.log").read_text().splitlines()
+    assert [line.rsplit(": ", 1)[1] for line in error_lines] == [
+        "main info 3", "main info 4", "main warning", "main error"]
+    aelog.init_app()
+
+
+def test_ring_buffer_handler():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    target = BlockingHandler()
+    target.name = "aelog_test_ring"
+    target.event.set()
+    handler = RingBufferHandler(target.name, capacity=2, max_buffers=1)
+    logger = logging.getLogger("tests.ring")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.info("first thread")
+        thread = threading.Thread(target=logger.info, args=("second thread",))
+        thread.start()
+        thread.join()
+        logger.error("dropped buffer")
+        assert target.messages == []
+        for index in range(3):
+            logger.debug(str(index))
+        logger.critical("flush")
+        logger.error("empty buffer")
+        assert target.messages == ["1", "2"]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_mmap_rotation(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    log_file = tmp_path / "mmap.log"
+    handler = MmapRotatingFileHandler(str(log_file), maxBytes=1000, backupCount=5, encoding="utf8")
+    logger = logging.getLogger("tests.mmap")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        assert log_file.stat().st_size == 1000
+        for index in range(600):
+            logger.warning("message %s", index)
+        logger.warning("x" * 3000)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    files = [log_file] + [tmp_path / f"mmap.log.{index}" for index in range(1, 6)]
+    assert not (tmp_path / "mmap.log.6").exists()
+    lines = [line for path in reversed(files) for line in path.read_text().splitlines()]
+    assert "\0" not in "".join(lines)
+    assert lines[-1] == "x" * 3000
+    assert lines[:-1] == [f"message {index}" for index in range(600 - len(lines) + 1, 600)]
+    assert all(path.stat().st_size <= 1000 for path in files[1:])
+
+
+def test_mmap_recovery(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    log_file = tmp_path / "mmap.log"
+    # 模拟进程异常退出, 文件末尾是写了一半的行和预先分配的空字节
+    log_file.write_bytes(b"line 0\nline 1\nline" + bytes(100))
+    aelog.init_app(aelog_access_file=str(log_file), aelog_console=False, aelog_mmap=True, aelog_max_bytes=4096)
+    assert isinstance(logging.root.handlers[0], MmapRotatingFileHandler)
+    aelog.info("line 2")
+    aelog.init_app()
+
+    lines = log_file.read_text().splitlines()
+    assert lines[:2] == ["line 0", "line 1"]
+    assert lines[2].endswith("line 2") and len(lines) == 3
+    assert log_file.read_bytes().endswith(b"line 2\n")
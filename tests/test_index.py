@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午7:20
+"""
+
+import logging
+import time
+
+import pytest
+
+import aelog
+from aelog.__main__ import main
+from aelog.binary import BinaryRotatingFileHandler
+from aelog.consts import FILE_DATE_FORMAT, FILE_LOG_FORMAT
+from aelog.context import ContextFilter
+from aelog.formatters import PlainFormatter
+from aelog.index import IndexedRotatingFileHandler, list_segments, parse_time, query, read_index
+
+BASE = 1760000000.0
+
+
+def write_records(handler: logging.Handler, count: int = 300):
+    """
+    写入每秒一条的日志, 奇数秒为WARNING
+    Args:
+        handler: handler
+        count: 日志数量
+    Returns:
+
+    """
+    handler.addFilter(ContextFilter())
+    for index in range(count):
+        level = logging.WARNING if index % 2 else logging.INFO
+        record = logging.LogRecord("tests.index", level, __file__, 10, "message %d", (index,), None, "write")
+        record.created = BASE + index
+        handler.handle(record)
+    handler.close()
+
+
+@pytest.mark.parametrize("handler_class, max_bytes", [(IndexedRotatingFileHandler, 4000),
+                                                      (BinaryRotatingFileHandler, 800)])
+def test_query_rotated_segments(tmp_path, handler_class, max_bytes):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    filename = str(tmp_path / "index.log")
+    handler = handler_class(filename, maxBytes=max_bytes, backupCount=50, compress="gzip", index_bytes=256)
+    handler.setFormatter(PlainFormatter(FILE_LOG_FORMAT, FILE_DATE_FORMAT))
+    write_records(handler)
+
+    segments = list_segments(filename)
+    assert len(segments) > 2 and segments[-1] == filename and segments[0].endswith(".gz")
+    # 每个文件都有自己的索引, 第一条索引是文件的第一条日志
+    assert all(read_index(segment) for segment in segments)
+    starts = [read_index(segment)[0][0] for segment in segments]
+    assert starts == sorted(starts) and starts[0] == BASE
+
+    messages = [text.rsplit(" ", 1)[1] for text in query(filename, BASE + 100, BASE + 150, slack=0)]
+    assert messages == [str(index) for index in range(100, 151)]
+    messages = [text.rsplit(" ", 1)[1] for text in query(filename, BASE + 290, level="WARNING", slack=0)]
+    assert messages == [str(index) for index in range(291, 300, 2)]
+    assert list(query(filename, until=BASE - 1)) == []
+
+
+def test_query_output_files(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "query.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_index_bytes=128,
+                   aelog_max_bytes=2000, aelog_backup_count=10)
+    start = time.time()
+    for index in range(60):
+        aelog.info("info message", index)
+        if index % 20 == 0:
+            aelog.error("error message", index)
+    logging.shutdown()
+    aelog.init_app()
+
+    assert read_index(str(tmp_path / "query.log.1"))
+    output = tmp_path / "query.txt"
+    main(["query", str(access_file), str(tmp_path / "query_error.log"), "--since", str(start - 1),
+          "--level", "error", "-o", str(output)])
+    # 错误日志同时写入了访问日志文件和错误日志文件, 文本时间只精确到秒, 同一秒内的顺序不确定
+    assert sorted(line.split("]: ", 1)[1] for line in output.read_text().splitlines()) == [
+        f"error message {index}" for index in (0, 0, 20, 20, 40, 40)]
+
+
+def test_parse_time():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    assert parse_time("1760000000") == 1760000000.0
+    assert parse_time("2025-10-09T08:53:20+00:00") == 1760000000.0
+    assert abs(parse_time("15m") - (time.time() - 900)) < 5
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
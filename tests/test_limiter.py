@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午5:40
+"""
+
+import logging
+
+import pytest
+
+import aelog
+from aelog.limiter import CallSiteLimiter, parse_rate
+
+
+class ListHandler(logging.Handler):
+    """
+    收集日志记录的handler
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class Payload(object):
+    """
+    记录格式化次数的消息参数
+    """
+    calls = 0
+
+    def __str__(self):
+        Payload.calls += 1
+        return "payload"
+
+
+def test_parse_rate():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    assert parse_rate("100/s") == (100, 1.0)
+    assert parse_rate("10 / m") == (10, 60.0)
+    for rate in ("100", "100/d", "0/s", "x/s"):
+        with pytest.raises(ValueError):
+            parse_rate(rate)
+
+
+def test_rate_limit():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_rate_limit="5/m")
+    handler = ListHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [handler]
+    try:
+        for index in range(20):
+            aelog.warning("limited message", index, Payload())
+        for index in range(3):
+            aelog.warning("other call site", index)
+        assert [record.getMessage() for record in handler.records] == [
+            f"limited message {index} payload" for index in range(5)] + [
+            f"other call site {index}" for index in range(3)]
+        assert Payload.calls == 5
+
+        # noinspection PyProtectedMember
+        from aelog.aelog import _limiter
+        _limiter._summary_at = 0
+        aelog.warning("after summary")
+        summary = handler.records[-2]
+        assert summary.name == "aelog"
+        assert summary.getMessage().startswith("suppressed 15 messages from 1 call sites")
+        assert handler.records[-1].getMessage() == "after summary"
+    finally:
+        logging.root.handlers = root_handlers
+        aelog.init_app()
+
+
+def test_sample():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    limiter = CallSiteLimiter(sample={"DEBUG": 0, "info": 1})
+    frame = logging.currentframe()
+    assert not any(limiter.allow(logging.DEBUG, frame) for _ in range(100))
+    assert all(limiter.allow(logging.INFO, frame) for _ in range(100))
+    assert all(limiter.allow(logging.WARNING, frame) for _ in range(100))
+    with pytest.raises(ValueError):
+        CallSiteLimiter(sample={"VERBOSE": 0.1})
+    with pytest.raises(ValueError):
+        CallSiteLimiter(sample={"DEBUG": 2})
+
+
+def test_dedup():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app(aelog_dedup=["ERROR"], aelog_dedup_window=60)
+    handler = ListHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    root_handlers = logging.root.handlers[:]
+    logging.root.handlers = [handler]
+    try:
+        for index in range(50):
+            try:
+                1 / 0
+            except ZeroDivisionError as e:
+                aelog.exception(e)
+            aelog.warning("not deduplicated", index)
+        assert len(handler.records) == 51
+        assert handler.records[0].exc_info[0] is ZeroDivisionError
+        assert [record.getMessage() for record in handler.records[1:]] == [
+            f"not deduplicated {index}" for index in range(50)]
+
+        aelog.init_app()
+        summary = handler.records[-1]
+        assert summary.levelno == logging.ERROR
+        assert summary.name == __name__
+        assert summary.funcName == "test_dedup"
+        assert summary.getMessage().startswith("ZeroDivisionError repeated 49 times in ")
+    finally:
+        logging.root.handlers = root_handlers
+        aelog.init_app()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午9:40
+"""
+
+import asyncio
+import logging
+import threading
+
+import aelog
+
+
+def test_stats(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "stats.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_stats=True,
+                   aelog_max_bytes=2000, aelog_backup_count=2)
+    aelog.reset_stats()
+
+    def worker():
+        for index in range(50):
+            aelog.info("stats message", index)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads[:2]:
+        thread.start()
+        thread.join()
+    for thread in threads[2:]:  # 已经退出的线程的计数合并保留
+        thread.start()
+        thread.join()
+    aelog.error("stats error")
+
+    async def main():
+        await aelog.async_warning("async stats message")
+        await aelog.flush()
+
+    asyncio.run(main())
+    data = aelog.stats()
+    aelog.init_app()
+
+    assert data["enabled"]
+    assert data["records"]["INFO"] == {__name__: 200}
+    assert data["records"]["ERROR"] == {__name__: 1}
+    assert data["records"]["WARNING"] == {__name__: 1}
+    access = data["handlers"]["aelog_access_file"]
+    assert access["records"] >= 202
+    assert access["bytes"] > 202 * len("stats message")
+    assert access["format_seconds"] > 0 and access["write_seconds"] > 0
+    assert access["rotation_seconds"]["count"] >= 2
+    assert access["emit_seconds"]["buckets"]["+Inf"] == access["records"]
+    assert data["handlers"]["aelog_error_file"]["records"] == 1
+    assert data["writer"]["wait_seconds"]["count"] >= 1
+
+    text = aelog.prometheus_text()
+    assert "# TYPE aelog_records_total counter" in text
+    assert 'aelog_writer_wait_seconds_bucket{le="+Inf"}' in text
+
+
+def test_stats_disabled():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    aelog.init_app()
+    aelog.reset_stats()
+    aelog.info("not counted")
+    data = aelog.stats()
+    assert not data["enabled"]
+    assert data["records"] == {} and data["handlers"] == {}
+    assert "emit" not in logging.root.handlers[0].__dict__
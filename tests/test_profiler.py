@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/18 下午10:30
+"""
+
+import asyncio
+import time
+
+import aelog
+
+
+def test_profile_report(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    profile_file = tmp_path / "profile.txt"
+    aelog.init_app(aelog_access_file=str(tmp_path / "profile.log"), aelog_console=False, aelog_profile=True,
+                   aelog_profile_file=str(profile_file), aelog_profile_interval=0.05)
+    payload = {"key": list(range(1000))}
+    for _ in range(20):
+        aelog.debug("big payload", payload)
+    for _ in range(5):
+        aelog.info("small message")
+
+    async def main():
+        await aelog.async_info("async message")
+        await aelog.flush()
+
+    asyncio.run(main())
+    report = aelog.profile_report()
+    time.sleep(0.2)
+    assert "aelog profile" in profile_file.read_text()
+    aelog.init_app()
+
+    top = report[0]
+    assert top["calls"] == 20
+    assert top["func"] == "test_profile_report"
+    assert top["bytes"] == 20 * len(f"big payload {payload}")
+    assert top["total_seconds"] == top["build_seconds"] + top["handle_seconds"] > 0
+    assert {site["calls"] for site in report} == {20, 5, 1}
+    assert aelog.profile_report() == []
+    assert "test_profile_report" in profile_file.read_text()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 下午9:10
+"""
+
+import logging
+import threading
+
+import pytest
+
+import aelog
+from aelog.reader import read_records
+
+
+@pytest.mark.parametrize("log_format", ["text", "json", "binary"])
+def test_read_rotated_files(tmp_path, log_format):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "reader.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_format=log_format,
+                   aelog_max_bytes=2000, aelog_backup_count=100, aelog_compress="gzip")
+    for index in range(200):
+        aelog.info("rotated message", index)
+    try:
+        1 / 0
+    except ZeroDivisionError as e:
+        aelog.exception(e)
+    logging.shutdown()
+    aelog.init_app()
+
+    assert list(tmp_path.glob("reader.log.*.gz"))
+    records = list(read_records(str(access_file)))
+    assert [record.getMessage() for record in records[:200]] == [f"rotated message {index}" for index in range(200)]
+    assert {(record.levelname, record.name, record.funcName) for record in records[:200]} == {
+        ("INFO", __name__, "test_read_rotated_files")}
+    assert len({record.lineno for record in records[:200]}) == 1
+    assert records[-1].levelno == logging.ERROR
+    assert "ZeroDivisionError" in (records[-1].exc_text or records[-1].getMessage())
+    assert [record.getMessage() for record in read_records(str(access_file), backups=False)][-1] == \
+        records[-1].getMessage()
+
+
+def test_read_mmap_file(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "mmap.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_mmap=True,
+                   aelog_max_bytes=64 * 1024)
+    for index in range(10):
+        aelog.info("mmap message", index)
+    # 正在写入的文件末尾填充了NUL
+    assert access_file.stat().st_size == 64 * 1024
+    records = read_records(str(access_file), follow=True, timeout=0.2, interval=0.01)
+    assert [next(records).getMessage() for _ in range(10)] == [f"mmap message {index}" for index in range(10)]
+    aelog.info("mmap message", 10)
+    assert [record.getMessage() for record in records] == ["mmap message 10"]
+    logging.shutdown()
+    aelog.init_app()
+
+
+def test_follow_rotation(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    access_file = tmp_path / "follow.log"
+    aelog.init_app(aelog_access_file=str(access_file), aelog_console=False, aelog_max_bytes=4000,
+                   aelog_backup_count=1000, aelog_compress="gzip")
+    aelog.info("follow message", 0)
+
+    def write():
+        for index in range(1, 3000):
+            aelog.info("follow message", index)
+
+    writer = threading.Thread(target=write)
+    records = read_records(str(access_file), follow=True, timeout=1, interval=0.01)
+    assert next(records).getMessage() == "follow message 0"
+    writer.start()
+    # 写入时发生了多次轮转, 有的轮转发生在两次检查之间
+    messages = [record.getMessage() for record in records]
+    writer.join()
+    logging.shutdown()
+    aelog.init_app()
+    assert len(list(tmp_path.glob("follow.log.*.gz"))) > 50
+    assert messages == [f"follow message {index}" for index in range(1, 3000)]
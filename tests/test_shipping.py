@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+@author: guoyanfeng
+@software: PyCharm
+@time: 2026/10/19 上午11:00
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import aelog
+from aelog.formatters import JsonFormatter
+from aelog.shipping import ShippingHandler, parse_address
+
+
+class Collector(object):
+    """
+    本地的日志收集端, 接收所有连接发送的数据
+    """
+
+    def __init__(self, family: int, address):
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.bind(address)
+        self.sock.listen()
+        self.address = self.sock.getsockname()
+        self.data = bytearray()
+        self.connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn: socket.socket):
+        with conn:
+            for chunk in iter(lambda: conn.recv(65536), b""):
+                self.data += chunk
+
+    def wait(self, predicate, timeout: float = 5) -> bytes:
+        deadline = time.monotonic() + timeout
+        while not predicate(bytes(self.data)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return bytes(self.data)
+
+    def close(self):
+        self.sock.close()
+
+
+def make_record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("tests.shipping", level, __file__, 1, msg, None, None)
+
+
+def test_parse_address():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    assert parse_address("collector:5170") == (socket.AF_INET, ("collector", 5170))
+    assert parse_address("tcp://[::1]:5170") == (socket.AF_INET, ("::1", 5170))
+    assert parse_address("unix:/run/collector.sock") == (socket.AF_UNIX, "/run/collector.sock")
+
+
+def test_ship_ndjson_tcp():
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    collector = Collector(socket.AF_INET, ("127.0.0.1", 0))
+    handler = ShippingHandler(collector.address, batch_size=16, flush_interval=0.05)
+    handler.setFormatter(JsonFormatter())
+    try:
+        for index in range(100):
+            handler.handle(make_record(f"message {index}"))
+        handler.flush()
+        lines = collector.wait(lambda data: data.count(b"\n") >= 100).decode().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == [f"message {index}" for index in range(100)]
+        # 所有批次共用一个连接
+        assert collector.connections == 1
+    finally:
+        handler.close()
+        collector.close()
+
+
+def test_ship_syslog_spill(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    path = str(tmp_path / "collector.sock")
+    spill_file = tmp_path / "ship.spill"
+    handler = ShippingHandler(f"unix:{path}", ship_format="syslog", flush_interval=0.01,
+                              spill_file=str(spill_file), app_name="tests")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        # 收集端不可用时写入spill文件
+        for index in range(3):
+            handler.handle(make_record(f"spilled {index}", logging.ERROR))
+        handler.flush()
+        assert spill_file.exists()
+
+        collector = Collector(socket.AF_UNIX, path)
+        time.sleep(0.2)  # 等待重连的退避时间
+        handler.handle(make_record("shipped"))
+        handler.flush()
+        data = collector.wait(lambda data: data.endswith(b"shipped"))
+        frames = []
+        while data:
+            length, _, data = data.partition(b" ")
+            frames.append(data[:int(length)].decode())
+            data = data[int(length):]
+        assert [frame.split(" - ", 1)[1] for frame in frames] == ["spilled 0", "spilled 1", "spilled 2", "shipped"]
+        assert frames[0].startswith("<11>1 ") and frames[-1].startswith("<14>1 ")
+        assert f" tests {os.getpid()} tests.shipping " in frames[0]
+        assert not spill_file.exists()
+        assert handler.dropped == 0
+        collector.close()
+    finally:
+        handler.close()
+
+
+def test_ship_output(tmp_path):
+    """
+
+    Args:
+
+    Returns:
+
+    """
+    path = str(tmp_path / "collector.sock")
+    collector = Collector(socket.AF_UNIX, path)
+    aelog.init_app(aelog_access_file=str(tmp_path / "ship.log"), aelog_console=False,
+                   aelog_ship_address=f"unix:{path}")
+    try:
+        aelog.bind(request_id="r1")
+        aelog.info("ship message")
+        logging.shutdown()
+        data = json.loads(collector.wait(lambda data: data.endswith(b"\n")).decode())
+        assert data["message"] == "ship message"
+        assert data["request_id"] == "r1"
+        assert data["level"] == "INFO"
+    finally:
+        aelog.unbind("request_id")
+        collector.close()
+        aelog.init_app()